@@ -6,6 +6,7 @@ from alembic import context
 
 from app.config import settings
 from app.models import Base
+from app.partitions import is_partition_name
 
 config = context.config
 
@@ -14,6 +15,12 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+def include_name(name, type_, parent_names):
+    # Monthly partitions are created at runtime by app.partitions, not by migrations
+    if type_ == "table":
+        return not is_partition_name(name)
+    return True
+
 def run_migrations_offline():
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
@@ -21,13 +28,14 @@ def run_migrations_offline():
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
     )
 
     with context.begin_transaction():
         context.run_migrations()
 
 def do_run_migrations(connection):
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(connection=connection, target_metadata=target_metadata, include_name=include_name)
 
     with context.begin_transaction():
         context.run_migrations()
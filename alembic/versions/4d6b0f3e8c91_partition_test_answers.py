@@ -0,0 +1,137 @@
+"""Partition test answers by month
+
+Revision ID: 4d6b0f3e8c91
+Revises: e91a4c7b2d58
+Create Date: 2026-10-19 15:48:22.630417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4d6b0f3e8c91'
+down_revision: Union[str, Sequence[str], None] = 'e91a4c7b2d58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+answer_status = postgresql.ENUM(name='testanswerstatusenum', create_type=False)
+
+# One partition per month from the oldest test up to a year ahead; app.partitions keeps extending it
+CREATE_PARTITIONS = """
+DO $$
+DECLARE
+    month date;
+    last_month date := (date_trunc('month', now()) + interval '12 months')::date;
+BEGIN
+    SELECT date_trunc('month', coalesce(min(created_at), now()))::date INTO month FROM tests;
+    WHILE month <= last_month LOOP
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF test_answers FOR VALUES FROM (%L) TO (%L)',
+            'test_answers_' || to_char(month, '"y"YYYY"m"MM'), month, (month + interval '1 month')::date
+        );
+        EXECUTE format(
+            'CREATE TABLE %I PARTITION OF test_answer_selections FOR VALUES FROM (%L) TO (%L)',
+            'test_answer_selections_' || to_char(month, '"y"YYYY"m"MM'), month, (month + interval '1 month')::date
+        );
+        month := (month + interval '1 month')::date;
+    END LOOP;
+END $$;
+"""
+
+
+def _create_foreign_keys(partitioned: bool):
+    # Added once the old tables are dropped, so they get the same names as before
+    op.create_foreign_key('test_answers_test_id_fkey', 'test_answers', 'tests', ['test_id'], ['test_id'])
+    op.create_foreign_key('test_answers_question_id_fkey', 'test_answers', 'questions', ['question_id'], ['question_id'])
+    op.create_foreign_key('test_answer_selections_selected_option_id_fkey', 'test_answer_selections', 'question_options', ['selected_option_id'], ['option_id'])
+    if partitioned:
+        op.create_foreign_key('test_answer_selections_answer_id_fkey', 'test_answer_selections', 'test_answers', ['answer_id', 'test_created_at'], ['answer_id', 'test_created_at'])
+    else:
+        op.create_foreign_key('test_answer_selections_answer_id_fkey', 'test_answer_selections', 'test_answers', ['answer_id'], ['answer_id'])
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_constraint('test_answer_selections_answer_id_fkey', 'test_answer_selections', type_='foreignkey')
+    op.rename_table('test_answers', 'test_answers_old')
+    op.execute('ALTER TABLE test_answers_old RENAME CONSTRAINT test_answers_pkey TO test_answers_old_pkey')
+    op.rename_table('test_answer_selections', 'test_answer_selections_old')
+    op.execute('ALTER TABLE test_answer_selections_old RENAME CONSTRAINT test_answer_selections_pkey TO test_answer_selections_old_pkey')
+
+    op.create_table('test_answers',
+    sa.Column('answer_id', sa.Uuid(), nullable=False),
+    sa.Column('test_created_at', sa.DateTime(), nullable=False),
+    sa.Column('test_id', sa.Uuid(), nullable=False),
+    sa.Column('question_id', sa.Uuid(), nullable=False),
+    sa.Column('integer_answer', sa.Integer(), nullable=True),
+    sa.Column('status', answer_status, nullable=False),
+    sa.Column('time_taken_seconds', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('answer_id', 'test_created_at'),
+    postgresql_partition_by='RANGE (test_created_at)'
+    )
+    op.create_index('ix_test_answers_test_id', 'test_answers', ['test_id'], unique=False)
+    op.create_table('test_answer_selections',
+    sa.Column('answer_id', sa.Uuid(), nullable=False),
+    sa.Column('test_created_at', sa.DateTime(), nullable=False),
+    sa.Column('selected_option_id', sa.Uuid(), nullable=False),
+    sa.PrimaryKeyConstraint('answer_id', 'test_created_at', 'selected_option_id'),
+    postgresql_partition_by='RANGE (test_created_at)'
+    )
+    op.execute(CREATE_PARTITIONS)
+
+    op.execute("""
+        INSERT INTO test_answers (answer_id, test_created_at, test_id, question_id, integer_answer, status, time_taken_seconds)
+        SELECT a.answer_id, t.created_at, a.test_id, a.question_id, a.integer_answer, a.status, a.time_taken_seconds
+        FROM test_answers_old a JOIN tests t ON t.test_id = a.test_id
+    """)
+    op.execute("""
+        INSERT INTO test_answer_selections (answer_id, test_created_at, selected_option_id)
+        SELECT s.answer_id, t.created_at, s.selected_option_id
+        FROM test_answer_selections_old s
+        JOIN test_answers_old a ON a.answer_id = s.answer_id
+        JOIN tests t ON t.test_id = a.test_id
+    """)
+    op.drop_table('test_answer_selections_old')
+    op.drop_table('test_answers_old')
+    _create_foreign_keys(partitioned=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Archived (dropped) partitions are not restored
+    op.rename_table('test_answer_selections', 'test_answer_selections_part')
+    op.rename_table('test_answers', 'test_answers_part')
+    op.execute('ALTER TABLE test_answer_selections_part RENAME CONSTRAINT test_answer_selections_pkey TO test_answer_selections_part_pkey')
+    op.execute('ALTER TABLE test_answers_part RENAME CONSTRAINT test_answers_pkey TO test_answers_part_pkey')
+
+    op.create_table('test_answers',
+    sa.Column('answer_id', sa.Uuid(), nullable=False),
+    sa.Column('test_id', sa.Uuid(), nullable=False),
+    sa.Column('question_id', sa.Uuid(), nullable=False),
+    sa.Column('integer_answer', sa.Integer(), nullable=True),
+    sa.Column('status', answer_status, nullable=False),
+    sa.Column('time_taken_seconds', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('answer_id')
+    )
+    op.create_table('test_answer_selections',
+    sa.Column('answer_id', sa.Uuid(), nullable=False),
+    sa.Column('selected_option_id', sa.Uuid(), nullable=False),
+    sa.PrimaryKeyConstraint('answer_id', 'selected_option_id')
+    )
+    op.execute("""
+        INSERT INTO test_answers (answer_id, test_id, question_id, integer_answer, status, time_taken_seconds)
+        SELECT answer_id, test_id, question_id, integer_answer, status, time_taken_seconds FROM test_answers_part
+    """)
+    op.execute("""
+        INSERT INTO test_answer_selections (answer_id, selected_option_id)
+        SELECT answer_id, selected_option_id FROM test_answer_selections_part
+    """)
+    # Dropping the parents drops their partitions
+    op.drop_table('test_answer_selections_part')
+    op.drop_table('test_answers_part')
+    _create_foreign_keys(partitioned=False)
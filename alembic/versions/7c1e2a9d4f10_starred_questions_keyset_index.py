@@ -0,0 +1,28 @@
+"""Starred questions keyset index
+
+Revision ID: 7c1e2a9d4f10
+Revises: 452b42b124a3
+Create Date: 2026-10-19 10:12:41.503218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e2a9d4f10'
+down_revision: Union[str, Sequence[str], None] = '452b42b124a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_user_starred_questions_user_created', 'user_starred_questions', ['user_id', 'created_at', 'question_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_starred_questions_user_created', table_name='user_starred_questions')
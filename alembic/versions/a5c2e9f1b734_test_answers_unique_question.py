@@ -0,0 +1,28 @@
+"""Test answers unique per question
+
+Revision ID: a5c2e9f1b734
+Revises: 4d6b0f3e8c91
+Create Date: 2026-10-19 17:20:54.118036
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5c2e9f1b734'
+down_revision: Union[str, Sequence[str], None] = '4d6b0f3e8c91'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_unique_constraint('uq_test_answers_test_question', 'test_answers', ['test_created_at', 'test_id', 'question_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_test_answers_test_question', 'test_answers', type_='unique')
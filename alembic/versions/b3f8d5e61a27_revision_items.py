@@ -0,0 +1,44 @@
+"""Revision items
+
+Revision ID: b3f8d5e61a27
+Revises: 7c1e2a9d4f10
+Create Date: 2026-10-19 11:03:17.284915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f8d5e61a27'
+down_revision: Union[str, Sequence[str], None] = '7c1e2a9d4f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('revision_items',
+    sa.Column('user_id', sa.String(), nullable=False),
+    sa.Column('question_id', sa.String(), nullable=False),
+    sa.Column('source', sa.Enum('INCORRECT', 'STARRED', name='revisionsourceenum'), nullable=False),
+    sa.Column('due_at', sa.DateTime(), nullable=False),
+    sa.Column('interval_days', sa.Float(), nullable=False),
+    sa.Column('ease_factor', sa.Float(), nullable=False),
+    sa.Column('repetitions', sa.Integer(), nullable=False),
+    sa.Column('last_reviewed_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.question_id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'question_id')
+    )
+    op.create_index('ix_revision_items_user_due', 'revision_items', ['user_id', 'due_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_revision_items_user_due', table_name='revision_items')
+    op.drop_table('revision_items')
+    sa.Enum(name='revisionsourceenum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,90 @@
+"""Dashboard materialized views
+
+Revision ID: c8e4a1d7f203
+Revises: a5c2e9f1b734
+Create Date: 2026-10-19 18:41:09.527663
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e4a1d7f203'
+down_revision: Union[str, Sequence[str], None] = 'a5c2e9f1b734'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Each view needs a unique index so it can be refreshed CONCURRENTLY (see app/dashboards.py).
+# All three aggregate the graded answers (CORRECT/INCORRECT, set by app.grading when a test
+# is completed); a question counts towards every exam it is applicable to.
+VIEWS = {
+    'mv_cohort_chapter_accuracy': ("""
+        SELECT e.exam_id, s.chapter_id, c.subject_id,
+               count(DISTINCT t.user_id) AS users,
+               count(*) AS questions_attempted,
+               count(*) FILTER (WHERE a.status = 'CORRECT') AS correct_answers,
+               (count(*) FILTER (WHERE a.status = 'CORRECT'))::float / count(*) AS accuracy,
+               avg(a.time_taken_seconds)::float AS avg_time_seconds
+        FROM test_answers a
+        JOIN tests t ON t.test_id = a.test_id
+        JOIN questions q ON q.question_id = a.question_id
+        JOIN subtopics s ON s.subtopic_id = q.subtopic_id
+        JOIN chapters c ON c.chapter_id = s.chapter_id
+        JOIN question_exam_applicability e ON e.question_id = q.question_id
+        WHERE a.status IN ('CORRECT', 'INCORRECT')
+        GROUP BY e.exam_id, s.chapter_id, c.subject_id
+    """, ['exam_id', 'chapter_id']),
+    'mv_cohort_question_type_accuracy': ("""
+        SELECT e.exam_id, q.question_type::text AS question_type,
+               count(DISTINCT t.user_id) AS users,
+               count(*) AS questions_attempted,
+               count(*) FILTER (WHERE a.status = 'CORRECT') AS correct_answers,
+               (count(*) FILTER (WHERE a.status = 'CORRECT'))::float / count(*) AS accuracy
+        FROM test_answers a
+        JOIN tests t ON t.test_id = a.test_id
+        JOIN questions q ON q.question_id = a.question_id
+        JOIN question_exam_applicability e ON e.question_id = q.question_id
+        WHERE a.status IN ('CORRECT', 'INCORRECT')
+        GROUP BY e.exam_id, q.question_type
+    """, ['exam_id', 'question_type']),
+    'mv_question_difficulty': ("""
+        SELECT q.question_id, q.difficulty_level::text AS difficulty_level,
+               count(*) AS attempts,
+               count(*) FILTER (WHERE a.status = 'CORRECT') AS correct_answers,
+               (count(*) FILTER (WHERE a.status = 'CORRECT'))::float / count(*) AS accuracy,
+               avg(a.time_taken_seconds)::float AS avg_time_seconds
+        FROM test_answers a
+        JOIN questions q ON q.question_id = a.question_id
+        WHERE a.status IN ('CORRECT', 'INCORRECT')
+        GROUP BY q.question_id, q.difficulty_level
+    """, ['question_id']),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('materialized_view_refreshes',
+    sa.Column('view_name', sa.String(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('view_name')
+    )
+    for name, (query, unique_columns) in VIEWS.items():
+        op.execute(f'CREATE MATERIALIZED VIEW {name} AS {query} WITH DATA')
+        op.create_index(f'ux_{name}', name, unique_columns, unique=True)
+        op.execute(
+            sa.text('INSERT INTO materialized_view_refreshes (view_name, refreshed_at) VALUES (:name, (now() at time zone \'utc\'))')
+            .bindparams(name=name)
+        )
+    # The difficulty endpoint lists questions hardest first
+    op.create_index('ix_mv_question_difficulty_accuracy', 'mv_question_difficulty', ['accuracy', 'question_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name in VIEWS:
+        op.execute(f'DROP MATERIALIZED VIEW {name}')
+    op.drop_table('materialized_view_refreshes')
@@ -0,0 +1,94 @@
+"""Native UUID keys
+
+Revision ID: e91a4c7b2d58
+Revises: b3f8d5e61a27
+Create Date: 2026-10-19 13:26:05.911342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91a4c7b2d58'
+down_revision: Union[str, Sequence[str], None] = 'b3f8d5e61a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Primary keys converted from text to uuid
+PRIMARY_KEYS = [
+    ('users', 'user_id'),
+    ('questions', 'question_id'),
+    ('question_options', 'option_id'),
+    ('tests', 'test_id'),
+    ('test_answers', 'answer_id'),
+]
+
+# (table, column, referenced table, referenced column) for every FK to those keys.
+# The constraints were created unnamed, so they carry Postgres' default <table>_<column>_fkey names.
+FOREIGN_KEYS = [
+    ('user_enrollments', 'user_id', 'users', 'user_id'),
+    ('user_question_type_analytics', 'user_id', 'users', 'user_id'),
+    ('user_subject_analytics', 'user_id', 'users', 'user_id'),
+    ('user_chapter_analytics', 'user_id', 'users', 'user_id'),
+    ('tests', 'user_id', 'users', 'user_id'),
+    ('question_exam_applicability', 'question_id', 'questions', 'question_id'),
+    ('question_options', 'question_id', 'questions', 'question_id'),
+    ('test_answers', 'test_id', 'tests', 'test_id'),
+    ('test_answers', 'question_id', 'questions', 'question_id'),
+    ('user_starred_questions', 'user_id', 'users', 'user_id'),
+    ('user_starred_questions', 'question_id', 'questions', 'question_id'),
+    ('test_answer_selections', 'answer_id', 'test_answers', 'answer_id'),
+    ('test_answer_selections', 'selected_option_id', 'question_options', 'option_id'),
+    ('revision_items', 'user_id', 'users', 'user_id'),
+    ('revision_items', 'question_id', 'questions', 'question_id'),
+]
+
+UUID_PATTERN = '^[0-9a-fA-F]{8}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{4}-?[0-9a-fA-F]{12}$'
+
+
+def _fk_name(table: str, column: str) -> str:
+    return f'{table}_{column}_fkey'
+
+
+def _columns_by_table() -> dict[str, list[str]]:
+    columns: dict[str, list[str]] = {}
+    for table, column in PRIMARY_KEYS + [(table, column) for table, column, _, _ in FOREIGN_KEYS]:
+        columns.setdefault(table, []).append(column)
+    return columns
+
+
+def _alter_types(type_sql: str, using) -> None:
+    # One ALTER TABLE per table: each one rewrites the table and rebuilds its indexes,
+    # so all of a table's columns are converted in a single pass
+    for table, columns in _columns_by_table().items():
+        clauses = ', '.join(f'ALTER COLUMN {column} TYPE {type_sql} USING {using(column)}' for column in columns)
+        op.execute(f'ALTER TABLE {table} {clauses}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(_fk_name(table, column), table, type_='foreignkey')
+
+    # Ids that are not UUIDs (e.g. hand-seeded questions) are mapped through md5, which is
+    # deterministic, so primary keys and the foreign keys pointing at them stay in step.
+    _alter_types('uuid', lambda column: f"CASE WHEN {column} ~ '{UUID_PATTERN}' THEN {column}::uuid ELSE md5({column})::uuid END")
+
+    for table, column, ref_table, ref_column in FOREIGN_KEYS:
+        op.create_foreign_key(_fk_name(table, column), table, ref_table, [column], [ref_column])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Ids that were md5-mapped on upgrade come back as their UUID text, not the original string
+    for table, column, _, _ in FOREIGN_KEYS:
+        op.drop_constraint(_fk_name(table, column), table, type_='foreignkey')
+
+    _alter_types('varchar', lambda column: f'{column}::text')
+
+    for table, column, ref_table, ref_column in FOREIGN_KEYS:
+        op.create_foreign_key(_fk_name(table, column), table, ref_table, [column], [ref_column])
@@ -0,0 +1,71 @@
+from collections.abc import Callable, Hashable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Rows fetched per round trip and written per Parquet row group
+BATCH_SIZE = 50_000
+
+
+async def stream_to_parquet(conn: AsyncConnection, sql: str, schema: "pa.Schema", path: Path, params: dict | None = None) -> int:
+    """
+    Run `sql` with a server-side cursor and write the rows to a zstd-compressed
+    Parquet file one batch at a time, so memory use doesn't grow with the table.
+    The query's columns must match `schema` by name. Returns the number of rows written.
+    """
+    # pyarrow is only needed by the export commands, keep it out of the app's import path
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rows_written = 0
+    result = await conn.stream(text(sql), params or {})
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        async for rows in result.mappings().partitions(BATCH_SIZE):
+            writer.write_batch(pa.RecordBatch.from_pylist([dict(row) for row in rows], schema=schema))
+            rows_written += len(rows)
+    return rows_written
+
+
+async def stream_to_parquet_split(
+    conn: AsyncConnection,
+    sql: str,
+    schema: "pa.Schema",
+    key: str,
+    path_for: Callable[[Hashable], Path],
+    params: dict | None = None,
+) -> dict[Hashable, int]:
+    """
+    Like stream_to_parquet, but split the rows into one file per value of the `key`
+    column, in a single pass over the query. One writer stays open per key, so the
+    query needs no ORDER BY; use it for low-cardinality keys only.
+    Returns the number of rows written per key.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writers: dict[Hashable, pq.ParquetWriter] = {}
+    counts: dict[Hashable, int] = {}
+    result = await conn.stream(text(sql), params or {})
+    try:
+        async for rows in result.mappings().partitions(BATCH_SIZE):
+            groups: dict[Hashable, list[dict]] = {}
+            for row in rows:
+                groups.setdefault(row[key], []).append(dict(row))
+            for value, group in groups.items():
+                if value not in writers:
+                    path = path_for(value)
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    writers[value] = pq.ParquetWriter(path, schema, compression="zstd")
+                    counts[value] = 0
+                writers[value].write_batch(pa.RecordBatch.from_pylist(group, schema=schema))
+                counts[value] += len(group)
+    finally:
+        for writer in writers.values():
+            writer.close()
+    return counts
@@ -8,6 +8,48 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # Connection pool - DB_POOL_WARMUP connections are opened at startup
+    DB_POOL_SIZE: int = 5
+    DB_POOL_WARMUP: int = 5
+
+    # Monthly test_answers partitions kept ready ahead of the current month,
+    # checked at startup and every PARTITION_CHECK_SECONDS
+    PARTITION_MONTHS_AHEAD: int = 3
+    PARTITION_CHECK_SECONDS: int = 6 * 3600
+
+    # Password hashing - bcrypt cost is calibrated at startup to take about
+    # PASSWORD_HASH_TARGET_MS per hash unless BCRYPT_ROUNDS pins it.
+    # Calibration never goes below BCRYPT_MIN_ROUNDS; keep it at least 12
+    # (passlib's default, used before calibration) so hashes never get weaker.
+    PASSWORD_HASH_TARGET_MS: int = 250
+    BCRYPT_MIN_ROUNDS: int = 12
+    BCRYPT_ROUNDS: int | None = None
+
+    # Login rate limiting - attempts allowed per window, per email and per client IP
+    LOGIN_ATTEMPTS_PER_EMAIL: int = 10
+    LOGIN_ATTEMPTS_PER_IP: int = 50
+    LOGIN_LIMIT_WINDOW_SECONDS: int = 300
+
+    # Live test sessions - answer deltas are written every LIVE_FLUSH_INTERVAL_SECONDS,
+    # or sooner once LIVE_MAX_PENDING answers are waiting
+    LIVE_FLUSH_INTERVAL_SECONDS: float = 2.0
+    LIVE_MAX_PENDING: int = 5000
+    # Time a new socket has to send its auth message
+    LIVE_AUTH_TIMEOUT_SECONDS: float = 10.0
+
+    # Dashboard materialized views
+    DASHBOARD_REFRESH_SECONDS: int = 900
+    DASHBOARD_PAGE_MAX: int = 500
+
+    # Starred questions
+    STARRED_CACHE_MAX_USERS: int = 10000
+    # Bounds how long another worker's star/unstar can go unseen by this one
+    STARRED_CACHE_TTL_SECONDS: float = 30
+    STARRED_PAGE_MAX: int = 100
+
+    # Revision queue
+    REVISION_BATCH_MAX: int = 50
+
     model_config = SettingsConfigDict(env_file=".env")
 
 settings = Settings()
\ No newline at end of file
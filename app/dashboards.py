@@ -0,0 +1,122 @@
+"""
+Cross-user dashboard aggregates.
+
+The GROUP BYs live in materialized views (created by migration c8e4a1d7f203) that are
+refreshed CONCURRENTLY on a schedule, so readers are never blocked and the request
+path only reads precomputed rows. materialized_view_refreshes records when each view
+was last refreshed; endpoints return it as the data's freshness.
+
+    python -m app.dashboards refresh
+"""
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from sqlalchemy import column, select, table, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+# Only one worker refreshes at a time; the others skip the round
+REFRESH_LOCK_ID = 7_312_005
+
+chapter_accuracy = table(
+    "mv_cohort_chapter_accuracy",
+    column("exam_id"), column("chapter_id"), column("subject_id"), column("users"),
+    column("questions_attempted"), column("correct_answers"), column("accuracy"), column("avg_time_seconds"),
+)
+question_type_accuracy = table(
+    "mv_cohort_question_type_accuracy",
+    column("exam_id"), column("question_type"), column("users"),
+    column("questions_attempted"), column("correct_answers"), column("accuracy"),
+)
+question_difficulty = table(
+    "mv_question_difficulty",
+    column("question_id"), column("difficulty_level"), column("attempts"),
+    column("correct_answers"), column("accuracy"), column("avg_time_seconds"),
+)
+
+VIEWS = (chapter_accuracy, question_type_accuracy, question_difficulty)
+
+
+async def refresh_views(min_interval_seconds: float = 0) -> bool:
+    """
+    Refresh every dashboard view not refreshed in the last `min_interval_seconds`.
+    Returns False if another worker holds the refresh lock.
+
+    Every worker runs the refresh loop, so the age check is what makes the views
+    refresh once per interval rather than once per worker per interval.
+    """
+    async with engine.connect() as conn:
+        locked = await conn.scalar(text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": REFRESH_LOCK_ID})
+        await conn.commit()
+        if not locked:
+            return False
+        try:
+            result = await conn.execute(
+                select(models.MaterializedViewRefresh.view_name, models.MaterializedViewRefresh.refreshed_at)
+            )
+            last_refreshed = dict(result.all())
+            await conn.commit()
+            for view in VIEWS:
+                started_at = datetime.utcnow()
+                refreshed_at = last_refreshed.get(view.name)
+                if refreshed_at is not None and started_at - refreshed_at < timedelta(seconds=min_interval_seconds):
+                    continue
+                # Each view in its own transaction so its refresh time is recorded as soon as it's done.
+                # The recorded time is when the refresh started - the data is as of then.
+                async with conn.begin():
+                    await conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view.name}"))
+                    insert = pg_insert(models.MaterializedViewRefresh).values(
+                        view_name=view.name, refreshed_at=started_at
+                    )
+                    await conn.execute(insert.on_conflict_do_update(
+                        index_elements=["view_name"], set_={"refreshed_at": insert.excluded.refreshed_at}
+                    ))
+        finally:
+            await conn.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": REFRESH_LOCK_ID})
+            await conn.commit()
+    return True
+
+
+async def run_refresh_loop(interval_seconds: float):
+    """
+    Refresh loop, started once per worker from the app lifespan.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await refresh_views(interval_seconds)
+        except Exception:
+            logger.exception("Failed to refresh dashboard views")
+
+
+async def read_view(db: AsyncSession, view, query) -> dict:
+    """
+    Run `query` against a dashboard view and return its rows with the view's refresh time.
+    """
+    rows = (await db.execute(query)).mappings().all()
+    refreshed_at = await db.scalar(
+        select(models.MaterializedViewRefresh.refreshed_at)
+        .where(models.MaterializedViewRefresh.view_name == view.name)
+    )
+    return {"refreshed_at": refreshed_at, "items": rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard materialized views")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("refresh", help="refresh every dashboard view now")
+    parser.parse_args()
+
+    if not asyncio.run(refresh_views()):
+        raise SystemExit("another refresh is already running")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Columnar export of the question bank and test attempts for offline analysis.
+
+Layout (one file per subject, so reading a subject never touches the others):
+
+    <out>/questions/subject_id=<id>.parquet
+    <out>/question_options/subject_id=<id>.parquet
+    <out>/tests/subject_id=<id|none>.parquet        # none = multi-subject tests (full mocks)
+    <out>/test_answers/subject_id=<id>.parquet      # by the subject of the question
+    <out>/vectors/<name>.npy                        # float32 (rows, 768), ordered by subject
+    <out>/vectors/<name>.index.parquet              # id, subject_id, row
+
+The whole export runs in one REPEATABLE READ snapshot and reads every table once,
+streaming it into the per-subject files, so memory use doesn't grow with the data.
+
+    python -m app.export --out exports/2026-10-19
+"""
+import argparse
+import asyncio
+from pathlib import Path
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from . import models
+from .columnar import BATCH_SIZE, stream_to_parquet_split
+from .database import engine
+
+VECTOR_DIM = 768
+
+SUBJECT_QUERIES = {
+    "questions": """
+        SELECT q.question_id::text AS question_id, ch.subject_id, st.chapter_id, q.subtopic_id,
+               q.question_text, q.image_url, q.question_type::text AS question_type,
+               q.difficulty_level::text AS difficulty_level, q.source::text AS source, q.source_details,
+               q.positive_marks, q.negative_marks, q.solution_explanation,
+               q.ai_validation_status::text AS ai_validation_status, q.created_at
+        FROM questions q
+        JOIN subtopics st ON st.subtopic_id = q.subtopic_id
+        JOIN chapters ch ON ch.chapter_id = st.chapter_id
+    """,
+    "question_options": """
+        SELECT o.option_id::text AS option_id, o.question_id::text AS question_id, ch.subject_id,
+               o.option_text, o.image_url, o.is_correct
+        FROM question_options o
+        JOIN questions q ON q.question_id = o.question_id
+        JOIN subtopics st ON st.subtopic_id = q.subtopic_id
+        JOIN chapters ch ON ch.chapter_id = st.chapter_id
+    """,
+    "tests": """
+        SELECT t.test_id::text AS test_id, t.user_id::text AS user_id,
+               coalesce(t.subject_id, ch.subject_id) AS subject_id, t.chapter_id, t.test_name,
+               t.test_type::text AS test_type, t.status::text AS status,
+               t.start_time, t.end_time, t.final_score, t.created_at
+        FROM tests t
+        LEFT JOIN chapters ch ON ch.chapter_id = t.chapter_id
+    """,
+    "test_answers": """
+        SELECT a.answer_id::text AS answer_id, a.test_id::text AS test_id, a.test_created_at,
+               a.question_id::text AS question_id, ch.subject_id, a.integer_answer,
+               a.status::text AS status, a.time_taken_seconds
+        FROM test_answers a
+        JOIN questions q ON q.question_id = a.question_id
+        JOIN subtopics st ON st.subtopic_id = q.subtopic_id
+        JOIN chapters ch ON ch.chapter_id = st.chapter_id
+    """,
+}
+
+
+def subject_schemas() -> dict:
+    import pyarrow as pa
+
+    return {
+        "questions": pa.schema([
+            ("question_id", pa.string()), ("subject_id", pa.int32()), ("chapter_id", pa.int32()),
+            ("subtopic_id", pa.int32()), ("question_text", pa.string()), ("image_url", pa.string()),
+            ("question_type", pa.string()), ("difficulty_level", pa.string()), ("source", pa.string()),
+            ("source_details", pa.string()), ("positive_marks", pa.int32()), ("negative_marks", pa.int32()),
+            ("solution_explanation", pa.string()), ("ai_validation_status", pa.string()),
+            ("created_at", pa.timestamp("us")),
+        ]),
+        "question_options": pa.schema([
+            ("option_id", pa.string()), ("question_id", pa.string()), ("subject_id", pa.int32()),
+            ("option_text", pa.string()), ("image_url", pa.string()), ("is_correct", pa.bool_()),
+        ]),
+        "tests": pa.schema([
+            ("test_id", pa.string()), ("user_id", pa.string()), ("subject_id", pa.int32()),
+            ("chapter_id", pa.int32()), ("test_name", pa.string()), ("test_type", pa.string()),
+            ("status", pa.string()), ("start_time", pa.timestamp("us")), ("end_time", pa.timestamp("us")),
+            ("final_score", pa.float64()), ("created_at", pa.timestamp("us")),
+        ]),
+        "test_answers": pa.schema([
+            ("answer_id", pa.string()), ("test_id", pa.string()), ("test_created_at", pa.timestamp("us")),
+            ("question_id", pa.string()), ("subject_id", pa.int32()), ("integer_answer", pa.int32()),
+            ("status", pa.string()), ("time_taken_seconds", pa.int32()),
+        ]),
+    }
+
+
+def subject_path(out_dir: Path, table: str, subject_id: int | None) -> Path:
+    return out_dir / table / f"subject_id={'none' if subject_id is None else subject_id}.parquet"
+
+
+def vector_sources():
+    """
+    (name, id column, vector column, subject_id expression, joins) for each exported vector set.
+    """
+    subject_of_subtopic = select(models.Chapter.subject_id).where(
+        models.Chapter.chapter_id == models.Subtopic.chapter_id
+    )
+    question_subject = (
+        subject_of_subtopic.where(models.Subtopic.subtopic_id == models.Question.subtopic_id).scalar_subquery()
+    )
+    chunk_subject = (
+        subject_of_subtopic.where(models.Subtopic.subtopic_id == models.SourceMaterialChunk.subtopic_id).scalar_subquery()
+    )
+    return [
+        ("questions", models.Question.question_id, models.Question.vector, question_subject),
+        ("source_material_chunks", models.SourceMaterialChunk.chunk_id, models.SourceMaterialChunk.vector, chunk_subject),
+    ]
+
+
+async def export_vectors(conn: AsyncConnection, out_dir: Path, name: str, id_column, vector_column, subject) -> int:
+    """
+    Write one vector set as a contiguous float32 .npy (filled in place through a memory map)
+    plus an id -> row index. Rows are ordered by subject so each subject is a contiguous slice.
+    """
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    count = await conn.scalar(select(func.count()).where(vector_column.is_not(None)))
+    out_dir.mkdir(parents=True, exist_ok=True)
+    vectors = np.lib.format.open_memmap(
+        out_dir / f"{name}.npy", mode="w+", dtype=np.float32, shape=(count, VECTOR_DIM)
+    )
+    index_schema = pa.schema([("id", pa.string()), ("subject_id", pa.int32()), ("row", pa.int64())])
+
+    subject_id = subject.label("subject_id")
+    result = await conn.stream(
+        select(id_column, subject_id, vector_column)
+        .where(vector_column.is_not(None))
+        .order_by(subject_id.asc().nulls_last(), id_column)
+    )
+    row = 0
+    with pq.ParquetWriter(out_dir / f"{name}.index.parquet", index_schema, compression="zstd") as writer:
+        async for batch in result.partitions(BATCH_SIZE):
+            # Rows added after the count are outside our snapshot, so the batch always fits
+            end = row + len(batch)
+            vectors[row:end] = np.stack([np.asarray(vector, dtype=np.float32) for _, _, vector in batch])
+            writer.write_batch(pa.RecordBatch.from_pylist(
+                [{"id": str(item_id), "subject_id": sid, "row": row + i} for i, (item_id, sid, _) in enumerate(batch)],
+                schema=index_schema,
+            ))
+            row = end
+    vectors.flush()
+    return count
+
+
+def open_vectors(export_dir: Path, name: str, subject_id: int | None = None):
+    """
+    Memory-map an exported vector set. Returns (vectors, ids); with `subject_id` only
+    that subject's contiguous slice is returned, and only its pages are ever read.
+    """
+    import numpy as np
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    vectors = np.load(export_dir / "vectors" / f"{name}.npy", mmap_mode="r")
+    index = pq.read_table(export_dir / "vectors" / f"{name}.index.parquet")
+    if subject_id is not None:
+        index = index.filter(pc.equal(index["subject_id"], subject_id))
+        if index.num_rows == 0:
+            return vectors[0:0], []
+        rows = index["row"]
+        vectors = vectors[pc.min(rows).as_py():pc.max(rows).as_py() + 1]
+    return vectors, index["id"].to_pylist()
+
+
+async def export(out_dir: Path):
+    schemas = subject_schemas()
+    async with engine.connect() as conn:
+        # One consistent snapshot for every file
+        conn = await conn.execution_options(isolation_level="REPEATABLE READ")
+        async with conn.begin():
+            # One pass per table; rows are split into per-subject files as they stream in
+            for table, sql in SUBJECT_QUERIES.items():
+                counts = await stream_to_parquet_split(
+                    conn, sql, schemas[table], "subject_id",
+                    lambda subject_id, table=table: subject_path(out_dir, table, subject_id),
+                )
+                for subject_id, rows in sorted(counts.items(), key=lambda item: (item[0] is None, item[0] or 0)):
+                    print(f"{table} subject_id={subject_id}: {rows} rows")
+
+            for name, id_column, vector_column, subject in vector_sources():
+                rows = await export_vectors(conn, out_dir / "vectors", name, id_column, vector_column, subject)
+                print(f"vectors {name}: {rows} rows")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the question bank and attempts to Parquet/NumPy")
+    parser.add_argument("--out", type=Path, required=True, help="output directory")
+    args = parser.parse_args()
+    asyncio.run(export(args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import uuid
+from datetime import datetime
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+CHOICE_TYPES = (models.QuestionType.MCSC, models.QuestionType.MCMC)
+
+
+def grade_answer(question_type: models.QuestionType, selected: set, integer_answer: int | None, correct_options: list) -> models.TestAnswerStatusEnum:
+    """
+    Grade one answer. `correct_options` are the question's options with is_correct set.
+
+    Choice questions are correct only if exactly the correct options are selected
+    (no partial credit). INT/NUM questions store their answer as the text of the
+    correct option and are compared numerically.
+    """
+    if question_type in CHOICE_TYPES:
+        if not selected:
+            return models.TestAnswerStatusEnum.UNATTEMPTED
+        correct = {option.option_id for option in correct_options}
+        return models.TestAnswerStatusEnum.CORRECT if selected == correct else models.TestAnswerStatusEnum.INCORRECT
+
+    if integer_answer is None:
+        return models.TestAnswerStatusEnum.UNATTEMPTED
+    for option in correct_options:
+        try:
+            if float(option.option_text) == integer_answer:
+                return models.TestAnswerStatusEnum.CORRECT
+        except (TypeError, ValueError):
+            continue
+    return models.TestAnswerStatusEnum.INCORRECT
+
+
+async def grade_test(db: AsyncSession, test_id: uuid.UUID, test_created_at: datetime) -> float:
+    """
+    Grade every stored answer of a test, write their statuses and the test's final_score.
+    A few queries whatever the number of questions. Does not commit.
+    """
+    result = await db.execute(
+        # Only the columns grading needs - not the question text or its vector
+        select(
+            models.TestAnswer,
+            models.Question.question_type,
+            models.Question.positive_marks,
+            models.Question.negative_marks,
+        )
+        .join(models.Question, models.Question.question_id == models.TestAnswer.question_id)
+        .where(
+            models.TestAnswer.test_created_at == test_created_at,
+            models.TestAnswer.test_id == test_id,
+        )
+    )
+    answers = result.all()
+    answer_ids = [row.TestAnswer.answer_id for row in answers]
+    question_ids = {row.TestAnswer.question_id for row in answers}
+
+    selected: dict[uuid.UUID, set] = {}
+    if answer_ids:
+        result = await db.execute(
+            select(models.TestAnswerSelection.answer_id, models.TestAnswerSelection.selected_option_id).where(
+                models.TestAnswerSelection.test_created_at == test_created_at,
+                models.TestAnswerSelection.answer_id.in_(answer_ids),
+            )
+        )
+        for answer_id, option_id in result.all():
+            selected.setdefault(answer_id, set()).add(option_id)
+
+    correct_options: dict[uuid.UUID, list] = {}
+    if question_ids:
+        result = await db.execute(
+            select(models.QuestionOption).where(
+                models.QuestionOption.question_id.in_(question_ids),
+                models.QuestionOption.is_correct.is_(True),
+            )
+        )
+        for option in result.scalars().all():
+            correct_options.setdefault(option.question_id, []).append(option)
+
+    score = 0.0
+    updates = []
+    for row in answers:
+        answer = row.TestAnswer
+        status = grade_answer(
+            row.question_type,
+            selected.get(answer.answer_id, set()),
+            answer.integer_answer,
+            correct_options.get(answer.question_id, []),
+        )
+        if status == models.TestAnswerStatusEnum.CORRECT:
+            score += row.positive_marks
+        elif status == models.TestAnswerStatusEnum.INCORRECT:
+            score -= row.negative_marks
+        updates.append({"answer_id": answer.answer_id, "test_created_at": answer.test_created_at, "status": status})
+
+    if updates:
+        await db.execute(update(models.TestAnswer), updates)
+    await db.execute(update(models.Test).where(models.Test.test_id == test_id).values(final_score=score))
+    return score
@@ -0,0 +1,104 @@
+import time
+import uuid
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from .config import settings
+
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# bcrypt cost limits supported by the algorithm
+BCRYPT_MIN_ROUNDS = 4
+BCRYPT_MAX_ROUNDS = 31
+
+# Cost of the dummy hash, matched at startup to the hashes users actually have
+_dummy_hash_rounds: int | None = None
+
+
+def time_bcrypt_hash(rounds: int, samples: int = 3) -> float:
+    """
+    Return the best-of-`samples` time in seconds to hash one password at the given cost.
+    """
+    from passlib.context import CryptContext
+
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    best = float("inf")
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.hash("calibration-password")
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def calibrate_bcrypt_rounds(target_ms: int, floor: int) -> int:
+    """
+    Pick the highest bcrypt cost whose hash time stays within `target_ms` on this machine,
+    but never below `floor`. Each extra round doubles the work, so one measurement
+    is enough to extrapolate.
+    """
+    rounds = max(BCRYPT_MIN_ROUNDS, floor)
+    elapsed_ms = time_bcrypt_hash(rounds) * 1000
+    while rounds < BCRYPT_MAX_ROUNDS and elapsed_ms * 2 <= target_ms:
+        rounds += 1
+        elapsed_ms *= 2
+    return rounds
+
+
+@lru_cache(maxsize=1)
+def get_pwd_context() -> "CryptContext":
+    """
+    CryptContext with the configured (or calibrated) bcrypt cost. Hashes made with
+    a lower cost report needs_update() and are upgraded on the next successful login.
+
+    Built on first use (normally during app startup) so importing the app stays cheap.
+    """
+    from passlib.context import CryptContext
+
+    rounds = settings.BCRYPT_ROUNDS or calibrate_bcrypt_rounds(
+        settings.PASSWORD_HASH_TARGET_MS, settings.BCRYPT_MIN_ROUNDS
+    )
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__rounds=rounds,
+        bcrypt__min_rounds=rounds,
+    )
+
+
+async def typical_stored_rounds(conn: AsyncConnection, sample: int = 1000) -> int | None:
+    """
+    Most common bcrypt cost among a sample of stored password hashes, or None if there are none.
+    Until every user has been rehashed this can be lower than the calibrated cost.
+    """
+    return await conn.scalar(
+        text(
+            "SELECT substring(password_hash from 5 for 2)::int AS rounds "
+            "FROM (SELECT password_hash FROM users WHERE password_hash LIKE '$2_$__$%' LIMIT :sample) s "
+            "GROUP BY rounds ORDER BY count(*) DESC LIMIT 1"
+        ),
+        {"sample": sample},
+    )
+
+
+def set_dummy_hash_rounds(rounds: int | None):
+    global _dummy_hash_rounds
+    _dummy_hash_rounds = rounds
+    get_dummy_password_hash.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def get_dummy_password_hash() -> str:
+    """
+    Hash to verify against when the email is unknown, so a miss costs the same bcrypt time as a hit.
+    Uses the typical stored cost (see set_dummy_hash_rounds) rather than the calibrated one,
+    so unknown emails time like the users that haven't been rehashed yet.
+    """
+    if _dummy_hash_rounds is None:
+        return get_pwd_context().hash(uuid.uuid4().hex)
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], bcrypt__rounds=_dummy_hash_rounds).hash(uuid.uuid4().hex)
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+from fastapi import WebSocket
+from sqlalchemy import delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from . import models, schemas
+from .database import SessionLocal
+from .ids import uuid7
+
+logger = logging.getLogger(__name__)
+
+# Failed flushes after which a test's pending answers are dropped
+MAX_WRITE_ATTEMPTS = 3
+
+
+class AnswerWriteError(Exception):
+    """
+    Some pending answers could not be written; they stay pending unless they were dropped.
+    """
+
+
+class AnswerBatcher:
+    """
+    Buffers answer deltas from live sessions and writes them in batches.
+
+    Deltas are coalesced per (test, question), so only the latest state of an answer
+    is written, and every flush is a handful of statements however many sockets are open.
+    """
+
+    def __init__(self, interval_seconds: float, max_pending: int):
+        self.interval_seconds = interval_seconds
+        self.max_pending = max_pending
+        self._pending: dict[tuple[uuid.UUID, uuid.UUID], dict] = {}
+        self._lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+
+    def add(self, test_id: uuid.UUID, test_created_at: datetime, delta: schemas.LiveAnswerDelta):
+        self._pending[(test_id, delta.question_id)] = {
+            "test_id": test_id,
+            "test_created_at": test_created_at,
+            "question_id": delta.question_id,
+            "integer_answer": delta.integer_answer,
+            # Graded to CORRECT/INCORRECT by app.grading when the test is completed;
+            # until then only review marks are tracked
+            "status": models.TestAnswerStatusEnum.MARKED_FOR_REVIEW if delta.marked_for_review
+                      else models.TestAnswerStatusEnum.UNATTEMPTED,
+            "time_taken_seconds": delta.time_taken_seconds,
+            "selected_option_ids": delta.selected_option_ids,
+        }
+        if len(self._pending) >= self.max_pending:
+            self._wakeup.set()
+
+    async def run(self):
+        """
+        Flush loop, started once per worker from the app lifespan.
+        """
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                # Shielded so cancelling the loop at shutdown can't abandon a batch mid-write
+                await asyncio.shield(self.flush())
+            except Exception:
+                logger.exception("Failed to flush live answers")
+
+    async def flush(self, test_id: uuid.UUID | None = None):
+        """
+        Write pending deltas (all of them, or only those of `test_id`).
+
+        A failed batch is retried one test at a time, so a test whose rows can't be
+        written doesn't hold up the others. That test's rows go back for the next flush
+        and are dropped after MAX_WRITE_ATTEMPTS. Raises AnswerWriteError if anything
+        was left unwritten.
+        """
+        async with self._lock:
+            if test_id is None:
+                batch, self._pending = list(self._pending.values()), {}
+            else:
+                keys = [key for key in self._pending if key[0] == test_id]
+                batch = [self._pending.pop(key) for key in keys]
+            if not batch:
+                return
+            try:
+                await write_answers(batch)
+                return
+            except Exception:
+                logger.exception("Failed to write %d live answers, retrying per test", len(batch))
+
+            by_test: defaultdict[uuid.UUID, list[dict]] = defaultdict(list)
+            for row in batch:
+                by_test[row["test_id"]].append(row)
+            failed = []
+            for failed_test_id, rows in by_test.items():
+                try:
+                    await write_answers(rows)
+                except Exception:
+                    logger.exception("Failed to write %d live answers of test %s", len(rows), failed_test_id)
+                    self._requeue(rows)
+                    failed.append(failed_test_id)
+            if failed:
+                raise AnswerWriteError(f"Answers of {len(failed)} tests were not written")
+
+    def _requeue(self, rows: list[dict]):
+        attempts = rows[0].get("attempts", 0) + 1
+        if attempts >= MAX_WRITE_ATTEMPTS:
+            logger.error("Dropping %d live answers of test %s after %d failed writes", len(rows), rows[0]["test_id"], attempts)
+            return
+        for row in rows:
+            # Unless a newer delta has replaced it meanwhile
+            self._pending.setdefault((row["test_id"], row["question_id"]), {**row, "attempts": attempts})
+
+
+async def write_answers(batch: list[dict]):
+    """
+    Upsert a batch of answers and replace their option selections.
+    Rows naming unknown questions, or options of another question, are dropped
+    rather than failing the whole batch, as are rows for tests that have been
+    completed meanwhile (possibly from a socket on another worker).
+    """
+    async with SessionLocal() as db:
+        test_ids = {row["test_id"] for row in batch}
+        result = await db.execute(
+            select(models.Test.test_id).where(
+                models.Test.test_id.in_(test_ids),
+                models.Test.status != models.TestStatusEnum.COMPLETED,
+            )
+        )
+        open_tests = set(result.scalars().all())
+        batch = [row for row in batch if row["test_id"] in open_tests]
+        if not batch:
+            return
+
+        question_ids = {row["question_id"] for row in batch}
+        result = await db.execute(
+            select(models.Question.question_id).where(models.Question.question_id.in_(question_ids))
+        )
+        known_questions = set(result.scalars().all())
+        batch = [row for row in batch if row["question_id"] in known_questions]
+        if not batch:
+            return
+
+        option_ids = {option_id for row in batch for option_id in row["selected_option_ids"]}
+        option_question = {}
+        if option_ids:
+            result = await db.execute(
+                select(models.QuestionOption.option_id, models.QuestionOption.question_id)
+                .where(models.QuestionOption.option_id.in_(option_ids))
+            )
+            option_question = dict(result.all())
+
+        insert = pg_insert(models.TestAnswer).values([
+            {
+                "answer_id": uuid7(),
+                "test_created_at": row["test_created_at"],
+                "test_id": row["test_id"],
+                "question_id": row["question_id"],
+                "integer_answer": row["integer_answer"],
+                "status": row["status"],
+                "time_taken_seconds": row["time_taken_seconds"],
+            }
+            for row in batch
+        ])
+        result = await db.execute(
+            insert.on_conflict_do_update(
+                index_elements=["test_created_at", "test_id", "question_id"],
+                set_={
+                    "integer_answer": insert.excluded.integer_answer,
+                    "status": insert.excluded.status,
+                    "time_taken_seconds": insert.excluded.time_taken_seconds,
+                },
+            ).returning(models.TestAnswer.answer_id, models.TestAnswer.test_id, models.TestAnswer.question_id)
+        )
+        answer_ids = {(test_id, question_id): answer_id for answer_id, test_id, question_id in result.all()}
+
+        keys = [(answer_ids[(row["test_id"], row["question_id"])], row["test_created_at"]) for row in batch]
+        await db.execute(
+            delete(models.TestAnswerSelection).where(
+                tuple_(models.TestAnswerSelection.answer_id, models.TestAnswerSelection.test_created_at).in_(keys)
+            )
+        )
+        selections = [
+            {"answer_id": answer_id, "test_created_at": test_created_at, "selected_option_id": option_id}
+            for row, (answer_id, test_created_at) in zip(batch, keys)
+            for option_id in dict.fromkeys(row["selected_option_ids"])
+            if option_question.get(option_id) == row["question_id"]
+        ]
+        if selections:
+            await db.execute(pg_insert(models.TestAnswerSelection).values(selections))
+        await db.commit()
+
+
+class LiveSessions:
+    """
+    Open sockets and current status per test in this worker, so a status change
+    made on one socket reaches every tab of the session.
+    """
+
+    def __init__(self):
+        self._sockets: defaultdict[uuid.UUID, set[WebSocket]] = defaultdict(set)
+        self._status: dict[uuid.UUID, models.TestStatusEnum] = {}
+
+    def add(self, test_id: uuid.UUID, websocket: WebSocket, status: models.TestStatusEnum):
+        self._sockets[test_id].add(websocket)
+        # A socket that is already open may know a newer status than the DB row this one read
+        self._status.setdefault(test_id, status)
+
+    def remove(self, test_id: uuid.UUID, websocket: WebSocket):
+        sockets = self._sockets.get(test_id)
+        if sockets is not None:
+            sockets.discard(websocket)
+            if not sockets:
+                del self._sockets[test_id]
+                self._status.pop(test_id, None)
+
+    def status(self, test_id: uuid.UUID) -> models.TestStatusEnum:
+        return self._status[test_id]
+
+    async def set_status(self, test_id: uuid.UUID, status: models.TestStatusEnum):
+        self._status[test_id] = status
+        await self.broadcast(test_id, {"type": "status", "status": status.value})
+
+    async def broadcast(self, test_id: uuid.UUID, message: dict):
+        for websocket in list(self._sockets.get(test_id, ())):
+            try:
+                await websocket.send_json(message)
+            except Exception:
+                self.remove(test_id, websocket)
@@ -1,62 +1,136 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, BackgroundTasks, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from datetime import datetime, timedelta, timezone
+import asyncio
 import uuid
-from sqlalchemy import select
+from sqlalchemy import select, delete, update, tuple_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 
 # project modules
 from . import models, schemas
-from .database import engine, get_db
+from .database import engine, get_db, SessionLocal
 from .config import settings
+from .starred import starred_cache, encode_cursor, decode_cursor, get_starred_ids
+from .revision import schedule_next, enqueue_questions, enqueue_incorrect_answers
+from .ratelimit import LocalLimiterBackend, LoginLimiter
+from .hashing import get_pwd_context, get_dummy_password_hash, set_dummy_hash_rounds, typical_stored_rounds
+from .ids import uuid7
+from .partitions import ensure_partitions, run_ensure_loop
+from .live import AnswerBatcher, AnswerWriteError, LiveSessions
+from .grading import grade_test
+from . import dashboards
 
 
 from fastapi.middleware.cors import CORSMiddleware
 
 # Use alembic
 
+# jose and passlib/bcrypt are imported lazily (see create_access_token, get_current_user
+# and app.hashing) and warmed up in lifespan() so importing this module stays fast.
+
 # --- Security & Hashing Setup ---
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-app = FastAPI()
-
-# --- CORS ---
-# 2. DEFINE THE ALLOWED ORIGINS (FRONTEND ADDRESSES)
-# For development, we can be permissive. Flutter web uses random ports.
-# We include the standard localhost addresses.
-origins = ["*"]
-    #"http://localhost",
-    #"http://localhost:8080",
-    # Add any other specific port your Flutter app runs on if you know it
-    # Or for maximum ease in local dev, you could use "*"
-    # "http://localhost:54321" # Example of a specific Flutter dev port
-#]
-
-
-# 3. ADD THE MIDDLEWARE TO YOUR APP
-# This should be added before your routes are defined.
-app.add_middleware(
-    CORSMiddleware,
-    # allow_origins=settings.ALLOWED_ORIGINS, # <-- We are replacing this line
-    allow_origin_regex=settings.CORS_ORIGIN_REGEX, # <-- With this new line
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+login_limiter = LoginLimiter(
+    LocalLimiterBackend(),
+    per_email=settings.LOGIN_ATTEMPTS_PER_EMAIL,
+    per_ip=settings.LOGIN_ATTEMPTS_PER_IP,
+    window_seconds=settings.LOGIN_LIMIT_WINDOW_SECONDS,
 )
 
+answer_batcher = AnswerBatcher(settings.LIVE_FLUSH_INTERVAL_SECONDS, settings.LIVE_MAX_PENDING)
+live_sessions = LiveSessions()
+
+router = APIRouter()
+
+
+# --- App Factory ---
+
+async def warm_up_pool(connections: int):
+    """
+    Open `connections` pooled connections concurrently and hand them back to the pool,
+    so the first requests of a new worker don't pay for connection setup.
+    """
+    async def open_one():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(open_one() for _ in range(connections)))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    import jose.jwt  # noqa: F401 - pre-import so the first login doesn't pay for it
+
+    # Calibrating bcrypt is CPU-bound; run it in a thread while the pool connects.
+    await asyncio.gather(
+        asyncio.to_thread(get_pwd_context),
+        warm_up_pool(min(settings.DB_POOL_WARMUP, settings.DB_POOL_SIZE)),
+    )
+    async with engine.begin() as conn:
+        await ensure_partitions(conn, settings.PARTITION_MONTHS_AHEAD)
+        set_dummy_hash_rounds(await typical_stored_rounds(conn))
+    await asyncio.to_thread(get_dummy_password_hash)
+    batcher_task = asyncio.create_task(answer_batcher.run())
+    refresh_task = asyncio.create_task(dashboards.run_refresh_loop(settings.DASHBOARD_REFRESH_SECONDS))
+    partition_task = asyncio.create_task(run_ensure_loop(settings.PARTITION_CHECK_SECONDS))
+    yield
+    partition_task.cancel()
+    refresh_task.cancel()
+    batcher_task.cancel()
+    # Let a flush that was in flight finish before the final one
+    try:
+        await batcher_task
+    except asyncio.CancelledError:
+        pass
+    await answer_batcher.flush()
+    await engine.dispose()
+
+def create_app() -> FastAPI:
+    """
+    App factory. Run with `uvicorn --factory app.main:create_app`.
+    """
+    app = FastAPI(lifespan=lifespan)
+
+    # --- CORS ---
+    # Origins are matched by CORS_ORIGIN_REGEX; Flutter web uses random ports in development.
+    app.add_middleware(
+        CORSMiddleware,
+        # allow_origins=settings.ALLOWED_ORIGINS, # <-- We are replacing this line
+        allow_origin_regex=settings.CORS_ORIGIN_REGEX, # <-- With this new line
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    app.include_router(router)
+    return app
+
 
 # --- Utility Functions ---
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
+
+async def rehash_password(user_id: uuid.UUID, password: str):
+    """
+    Background task: re-hash a password stored with outdated parameters.
+    Runs after the login response has been sent.
+    """
+    new_hash = await asyncio.to_thread(get_password_hash, password)
+    async with SessionLocal() as db:
+        await db.execute(
+            update(models.User).where(models.User.user_id == user_id).values(password_hash=new_hash)
+        )
+        await db.commit()
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None):
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.now(timezone.utc) + expires_delta
@@ -70,6 +144,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     """
     Dependency to get the current user from a JWT token.
     """
+    from jose import JWTError, jwt
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -99,7 +175,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
 
 # --- Endpoints ---
 
-@app.post("/register", response_model=schemas.RegisterResponse)
+@router.post("/register", response_model=schemas.RegisterResponse)
 async def register_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
     # Check if user with that email already exists
     # Note: A proper implementation would have a dedicated function for this query
@@ -110,9 +186,10 @@ async def register_user(user: schemas.UserCreate, db: AsyncSession = Depends(get
             detail="Email already registered",
         )
     
-    hashed_password = get_password_hash(user.password)
+    # bcrypt is CPU-bound; keep it off the event loop
+    hashed_password = await asyncio.to_thread(get_password_hash, user.password)
     new_user = models.User(
-        user_id=str(uuid.uuid4()), 
+        user_id=uuid7(),
         email=user.email, 
         name=user.name, 
         password_hash=hashed_password
@@ -132,22 +209,44 @@ async def register_user(user: schemas.UserCreate, db: AsyncSession = Depends(get
         "token": {"access_token": access_token, "token_type": "bearer"}
     }
 
-@app.post("/login", response_model=schemas.Token)
+@router.post("/login", response_model=schemas.Token)
 async def login_for_access_token(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
+    request: Request,
+    background_tasks: BackgroundTasks,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: AsyncSession = Depends(get_db),
 ):
     # Note: form_data will have 'username' and 'password' fields.
     # We use the 'username' field for the email.
+
+    # Rate limit before touching the DB or bcrypt. Behind a load balancer request.client is
+    # only the real client if uvicorn trusts the proxy (FORWARDED_ALLOW_IPS, see the Dockerfile).
+    retry_after = login_limiter.check(form_data.username, request.client.host if request.client else None)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
     user_result = await db.execute(select(models.User).where(models.User.email == form_data.username))
     user = user_result.scalars().first()
-    
-    if not user or not verify_password(form_data.password, user.password_hash):
+
+    # bcrypt is CPU-bound; run it in a thread so the worker keeps serving other requests.
+    # Unknown emails are checked against a dummy hash so they take as long as real ones.
+    password_hash = user.password_hash if user else get_dummy_password_hash()
+    password_ok = await asyncio.to_thread(verify_password, form_data.password, password_hash)
+    if not user or not password_ok:
+        login_limiter.counters["failed"] += 1
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-        
+
+    if get_pwd_context().needs_update(user.password_hash):
+        background_tasks.add_task(rehash_password, user.user_id, form_data.password)
+
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
         data={"sub": user.email}, expires_delta=access_token_expires
@@ -155,7 +254,14 @@ async def login_for_access_token(
     
     return {"access_token": access_token, "token_type": "bearer"}
 
-@app.get("/users/me", response_model=schemas.UserPublic)
+@router.get("/login/limiter")
+async def login_limiter_stats(current_user: models.User = Depends(get_current_user)):
+    """
+    Counters of the login rate limiter for this worker.
+    """
+    return dict(login_limiter.counters)
+
+@router.get("/users/me", response_model=schemas.UserPublic)
 async def read_users_me(current_user: models.User = Depends(get_current_user)):
     """
     Fetch the currently authenticated user's data.
@@ -166,7 +272,320 @@ async def read_users_me(current_user: models.User = Depends(get_current_user)):
     # We just need to return the user object.
     return current_user
 
-@app.get("/getTest")
+@router.post("/starred", response_model=schemas.StarToggleResponse)
+async def toggle_starred(
+    request: schemas.StarToggleRequest,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Star and unstar many questions in one round trip.
+    Starring an already starred question (or unstarring one that isn't) is a no-op.
+    """
+    star = list(dict.fromkeys(request.star))
+    star_set = set(star)
+    unstar = [qid for qid in dict.fromkeys(request.unstar) if qid not in star_set]
+
+    if star:
+        existing = await db.execute(
+            select(models.Question.question_id).where(models.Question.question_id.in_(star))
+        )
+        missing = set(star) - set(existing.scalars().all())
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Unknown question ids: {sorted(str(qid) for qid in missing)}",
+            )
+        await db.execute(
+            pg_insert(models.UserStarredQuestion)
+            .values([
+                {"user_id": current_user.user_id, "question_id": qid, "created_at": datetime.utcnow()}
+                for qid in star
+            ])
+            .on_conflict_do_nothing(index_elements=["user_id", "question_id"])
+        )
+        await enqueue_questions(db, current_user.user_id, star, models.RevisionSourceEnum.STARRED)
+    if unstar:
+        await db.execute(
+            delete(models.UserStarredQuestion).where(
+                models.UserStarredQuestion.user_id == current_user.user_id,
+                models.UserStarredQuestion.question_id.in_(unstar),
+            )
+        )
+        # Drop unstarred questions from revision unless they were also answered wrong
+        await db.execute(
+            delete(models.RevisionItem).where(
+                models.RevisionItem.user_id == current_user.user_id,
+                models.RevisionItem.question_id.in_(unstar),
+                models.RevisionItem.source == models.RevisionSourceEnum.STARRED,
+            )
+        )
+    # Read before the commit, which expires current_user
+    user_id = current_user.user_id
+    await db.commit()
+
+    starred_cache.apply(user_id, star, unstar)
+    return {"starred": star, "unstarred": unstar}
+
+@router.get("/starred", response_model=schemas.StarredQuestionPage)
+async def list_starred(
+    limit: int = 20,
+    cursor: str | None = None,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List the user's starred questions, newest first, using keyset pagination
+    on (created_at, question_id) so deep pages cost the same as the first one.
+    """
+    limit = max(1, min(limit, settings.STARRED_PAGE_MAX))
+    query = (
+        select(models.UserStarredQuestion)
+        .where(models.UserStarredQuestion.user_id == current_user.user_id)
+        .order_by(models.UserStarredQuestion.created_at.desc(), models.UserStarredQuestion.question_id.desc())
+        .limit(limit + 1)
+    )
+    if cursor:
+        try:
+            after_created_at, after_question_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        query = query.where(
+            tuple_(models.UserStarredQuestion.created_at, models.UserStarredQuestion.question_id)
+            < tuple_(after_created_at, after_question_id)
+        )
+
+    result = await db.execute(query)
+    rows = result.scalars().all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].question_id)
+
+    return {"items": rows, "next_cursor": next_cursor}
+
+@router.get("/revise/next", response_model=list[schemas.RevisionQuestion])
+async def next_revision_questions(
+    limit: int = 10,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Serve the next due questions from the user's revision queue, oldest due first.
+    This is a single range read on ix_revision_items_user_due.
+    """
+    limit = max(1, min(limit, settings.REVISION_BATCH_MAX))
+    result = await db.execute(
+        # Only the columns served - not the question's vector
+        select(
+            models.RevisionItem.due_at,
+            models.RevisionItem.repetitions,
+            models.Question.question_id,
+            models.Question.question_text,
+            models.Question.question_type,
+        )
+        .join(models.Question, models.Question.question_id == models.RevisionItem.question_id)
+        .where(
+            models.RevisionItem.user_id == current_user.user_id,
+            models.RevisionItem.due_at <= datetime.utcnow(),
+        )
+        .order_by(models.RevisionItem.due_at)
+        .limit(limit)
+    )
+    starred = await get_starred_ids(db, current_user.user_id)
+
+    return [
+        {
+            "question_id": row.question_id,
+            "question_text": row.question_text,
+            "question_type": row.question_type.value,
+            "due_at": row.due_at,
+            "repetitions": row.repetitions,
+            "is_starred": row.question_id in starred,
+        }
+        for row in result.all()
+    ]
+
+@router.post("/revise/results", response_model=schemas.RevisionResultsResponse)
+async def submit_revision_results(
+    request: schemas.RevisionResultsRequest,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Record a batch of reviews. All items are read in one query and rescheduled
+    with a single executemany UPDATE.
+    """
+    # Last grade wins if a question is reported twice
+    quality = {r.question_id: r.quality for r in request.results}
+    if not quality:
+        return {"updated": 0}
+
+    result = await db.execute(
+        select(models.RevisionItem).where(
+            models.RevisionItem.user_id == current_user.user_id,
+            models.RevisionItem.question_id.in_(quality),
+        )
+    )
+    now = datetime.utcnow()
+    updates = [schedule_next(item, quality[item.question_id], now) for item in result.scalars().all()]
+    if updates:
+        await db.execute(update(models.RevisionItem), updates)
+        await db.commit()
+
+    return {"updated": len(updates)}
+
+@router.websocket("/tests/{test_id}/live")
+async def live_test_session(websocket: WebSocket, test_id: uuid.UUID):
+    """
+    Persistent channel for a running test. The first message must be
+    {"type": "auth", "token": ...}; the token is checked once, and is not taken from the
+    query string (browsers can't set headers on WebSockets) since access logs record it.
+
+    Upstream: {"type": "answer", ...} deltas, batched into test_answers by answer_batcher,
+    and {"type": "status", "status": ...} changes, written immediately.
+    Downstream: {"type": "status", ...} whenever the session's status changes.
+
+    Only ids are kept per connection - no DB session or ORM objects - so idle
+    sockets cost little more than the socket itself.
+    """
+    await websocket.accept()
+    try:
+        auth = schemas.LiveAuth.model_validate_json(
+            await asyncio.wait_for(websocket.receive_text(), settings.LIVE_AUTH_TIMEOUT_SECONDS)
+        )
+    except WebSocketDisconnect:
+        return
+    except (asyncio.TimeoutError, ValueError):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    async with SessionLocal() as db:
+        try:
+            user = await get_current_user(auth.token, db)
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        test = await db.get(models.Test, test_id)
+        if test is None or test.user_id != user.user_id:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        user_id = user.user_id
+        test_created_at = test.created_at
+        stored_status = test.status
+        start_time = test.start_time
+    # Don't keep ORM objects alive for the lifetime of the socket
+    del user, test, auth
+
+    # The status is shared by all sockets of the test in this worker, so a completion
+    # made on one socket stops the others from accepting answers
+    live_sessions.add(test_id, websocket, stored_status)
+    try:
+        await websocket.send_json({"type": "status", "status": live_sessions.status(test_id).value, "start_time": start_time and start_time.isoformat()})
+        while True:
+            try:
+                message = schemas.LiveClientMessage.validate_json(await websocket.receive_text())
+            except ValueError as exc:
+                await websocket.send_json({"type": "error", "detail": str(exc)})
+                continue
+
+            if message.type == "answer":
+                if live_sessions.status(test_id) == models.TestStatusEnum.COMPLETED:
+                    await websocket.send_json({"type": "error", "detail": "Test already completed"})
+                    continue
+                answer_batcher.add(test_id, test_created_at, message)
+                continue
+
+            new_status = models.TestStatusEnum(message.status)
+            if live_sessions.status(test_id) in (models.TestStatusEnum.COMPLETED, new_status):
+                continue
+            values = {"status": new_status}
+            if new_status == models.TestStatusEnum.COMPLETED:
+                # Everything answered so far must be stored before the test is graded
+                try:
+                    await answer_batcher.flush(test_id)
+                except AnswerWriteError:
+                    await websocket.send_json({"type": "error", "detail": "Answers could not be saved, try again"})
+                    continue
+                values["end_time"] = datetime.utcnow()
+            async with SessionLocal() as db:
+                # The status guard makes completion happen once, even across workers
+                result = await db.execute(
+                    update(models.Test)
+                    .where(models.Test.test_id == test_id, models.Test.status != models.TestStatusEnum.COMPLETED)
+                    .values(**values)
+                    .returning(models.Test.test_id)
+                )
+                if result.first() is None:
+                    new_status = models.TestStatusEnum.COMPLETED
+                elif new_status == models.TestStatusEnum.COMPLETED:
+                    await grade_test(db, test_id, test_created_at)
+                    await enqueue_incorrect_answers(db, user_id, test_id, test_created_at)
+                await db.commit()
+            await live_sessions.set_status(test_id, new_status)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        live_sessions.remove(test_id, websocket)
+
+@router.get("/dashboards/chapter-accuracy", response_model=schemas.ChapterAccuracyResponse)
+async def dashboard_chapter_accuracy(
+    exam_id: int,
+    subject_id: int | None = None,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Cohort accuracy per chapter, read from mv_cohort_chapter_accuracy.
+    """
+    view = dashboards.chapter_accuracy
+    query = select(view).where(view.c.exam_id == exam_id).order_by(view.c.chapter_id)
+    if subject_id is not None:
+        query = query.where(view.c.subject_id == subject_id)
+    return await dashboards.read_view(db, view, query)
+
+@router.get("/dashboards/question-type-accuracy", response_model=schemas.QuestionTypeAccuracyResponse)
+async def dashboard_question_type_accuracy(
+    exam_id: int,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Cohort accuracy per question type, read from mv_cohort_question_type_accuracy.
+    """
+    view = dashboards.question_type_accuracy
+    query = select(view).where(view.c.exam_id == exam_id).order_by(view.c.question_type)
+    return await dashboards.read_view(db, view, query)
+
+@router.get("/dashboards/question-difficulty", response_model=schemas.QuestionDifficultyResponse)
+async def dashboard_question_difficulty(
+    min_attempts: int = 20,
+    limit: int = 100,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Observed difficulty of questions (hardest first) next to their labelled
+    difficulty_level, read from mv_question_difficulty.
+    """
+    view = dashboards.question_difficulty
+    query = (
+        select(view)
+        .where(view.c.attempts >= min_attempts)
+        .order_by(view.c.accuracy, view.c.question_id)
+        .limit(max(1, min(limit, settings.DASHBOARD_PAGE_MAX)))
+    )
+    return await dashboards.read_view(db, view, query)
+
+@router.get("/health")
+async def health(db: AsyncSession = Depends(get_db)):
+    """
+    Readiness probe: succeeds once the worker can reach the database.
+    """
+    await db.execute(text("SELECT 1"))
+    return {"status": "ok"}
+
+@router.get("/getTest")
 async def sendTest():
     return {
         "sessionId": "session_mock_12345",
@@ -283,4 +702,8 @@ async def sendTest():
                 ]
             }
         ]
-    }
\ No newline at end of file
+    }
+
+
+# Kept for `uvicorn app.main:app`; routes, middleware and the lifespan are the same as with --factory
+app = create_app()
@@ -1,4 +1,5 @@
 import enum
+import uuid
 from datetime import datetime
 
 from sqlalchemy import (
@@ -12,13 +13,18 @@ from sqlalchemy import (
     Float,
     BigInteger,
     ForeignKey,
+    ForeignKeyConstraint,
     Text,
     PrimaryKeyConstraint,
-    UniqueConstraint
+    UniqueConstraint,
+    Index,
+    Uuid
 )
 from sqlalchemy.orm import declarative_base, relationship, Mapped, mapped_column
 from pgvector.sqlalchemy import Vector # For vector embeddings
 
+from .ids import uuid7
+
 Base = declarative_base()
 
 # ----------------------------------------Enums------------------------------------------------------
@@ -61,11 +67,15 @@ class TestAnswerStatusEnum(enum.Enum):
     UNATTEMPTED = "UNATTEMPTED"
     MARKED_FOR_REVIEW = "MARKED_FOR_REVIEW"
 
+class RevisionSourceEnum(enum.Enum):
+    INCORRECT = "INCORRECT" # Answered incorrectly in a test
+    STARRED = "STARRED"
+
 # ----------------------------------------Tables------------------------------------------------------
 
 class User(Base):
     __tablename__ = 'users'
-    user_id: Mapped[str] = mapped_column(String, primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid7)
     email: Mapped[str] = mapped_column(String, unique=True, nullable=False)
     password_hash: Mapped[str] = mapped_column(String, nullable=False)
     name: Mapped[str] = mapped_column(String)
@@ -91,7 +101,7 @@ class Exam(Base):
 
 class UserEnrollment(Base):
     __tablename__ = 'user_enrollments'
-    user_id: Mapped[str] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
     exam_id: Mapped[int] = mapped_column(ForeignKey('exams.exam_id'), primary_key=True)
 
     # Relationships
@@ -134,7 +144,7 @@ class Subtopic(Base):
 
 class Question(Base):
     __tablename__ = 'questions'
-    question_id: Mapped[str] = mapped_column(String, primary_key=True)
+    question_id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid7)
     question_text: Mapped[str] = mapped_column(Text, nullable=False)
     image_url: Mapped[str] = mapped_column(String, nullable=True)
     vector = mapped_column(Vector(768), nullable=True) # Assuming 768 dimensions
@@ -157,8 +167,8 @@ class Question(Base):
 
 class QuestionOption(Base):
     __tablename__ = 'question_options'
-    option_id: Mapped[str] = mapped_column(String, primary_key=True)
-    question_id: Mapped[str] = mapped_column(ForeignKey('questions.question_id'))
+    option_id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid7)
+    question_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('questions.question_id'))
     option_text: Mapped[str] = mapped_column(Text)
     image_url: Mapped[str] = mapped_column(String, nullable=True)
     is_correct: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -168,7 +178,7 @@ class QuestionOption(Base):
 
 class QuestionExamApplicability(Base):
     __tablename__ = 'question_exam_applicability'
-    question_id: Mapped[str] = mapped_column(ForeignKey('questions.question_id'), primary_key=True)
+    question_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('questions.question_id'), primary_key=True)
     exam_id: Mapped[int] = mapped_column(ForeignKey('exams.exam_id'), primary_key=True)
 
     # Relationships
@@ -179,8 +189,8 @@ class QuestionExamApplicability(Base):
 # Test Attempt Lifecycle
 class Test(Base):
     __tablename__ = 'tests'
-    test_id: Mapped[str] = mapped_column(String, primary_key=True)
-    user_id: Mapped[str] = mapped_column(ForeignKey('users.user_id'))
+    test_id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid7)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('users.user_id'))
     chapter_id: Mapped[int] = mapped_column(ForeignKey('chapters.chapter_id'), nullable=True)
     subject_id: Mapped[int] = mapped_column(ForeignKey('subjects.subject_id'), nullable=True)
     test_name: Mapped[str] = mapped_column(String)
@@ -199,9 +209,18 @@ class Test(Base):
 
 class TestAnswer(Base):
     __tablename__ = 'test_answers'
-    answer_id: Mapped[str] = mapped_column(String, primary_key=True)
-    test_id: Mapped[str] = mapped_column(ForeignKey('tests.test_id'))
-    question_id: Mapped[str] = mapped_column(ForeignKey('questions.question_id'))
+    __table_args__ = (
+        Index('ix_test_answers_test_id', 'test_id'),
+        # One answer per question per test; target of the live-session upserts
+        UniqueConstraint('test_created_at', 'test_id', 'question_id', name='uq_test_answers_test_question'),
+        # Monthly partitions, see app/partitions.py
+        {'postgresql_partition_by': 'RANGE (test_created_at)'},
+    )
+    answer_id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid7)
+    # Copy of tests.created_at - the partition key, so it is part of the primary key
+    test_created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    test_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('tests.test_id'))
+    question_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('questions.question_id'))
     integer_answer: Mapped[int] = mapped_column(Integer, nullable=True)
     status: Mapped[TestAnswerStatusEnum] = mapped_column(Enum(TestAnswerStatusEnum), default=TestAnswerStatusEnum.UNATTEMPTED)
     time_taken_seconds: Mapped[int] = mapped_column(Integer, default=0)
@@ -213,8 +232,17 @@ class TestAnswer(Base):
 
 class TestAnswerSelection(Base):
     __tablename__ = 'test_answer_selections'
-    answer_id: Mapped[str] = mapped_column(ForeignKey('test_answers.answer_id'), primary_key=True)
-    selected_option_id: Mapped[str] = mapped_column(ForeignKey('question_options.option_id'), primary_key=True)
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ['answer_id', 'test_created_at'],
+            ['test_answers.answer_id', 'test_answers.test_created_at'],
+        ),
+        # Partitioned like test_answers so a month can be detached from both together
+        {'postgresql_partition_by': 'RANGE (test_created_at)'},
+    )
+    answer_id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True)
+    test_created_at: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    selected_option_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('question_options.option_id'), primary_key=True)
     
     # Relationships
     test_answer: Mapped["TestAnswer"] = relationship(back_populates="selections")
@@ -223,19 +251,42 @@ class TestAnswerSelection(Base):
 # User Features
 class UserStarredQuestion(Base):
     __tablename__ = 'user_starred_questions'
-    user_id: Mapped[str] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
-    question_id: Mapped[str] = mapped_column(ForeignKey('questions.question_id'), primary_key=True)
+    __table_args__ = (
+        # Keyset pagination of a user's starred list (newest first)
+        Index('ix_user_starred_questions_user_created', 'user_id', 'created_at', 'question_id'),
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
+    question_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('questions.question_id'), primary_key=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     
     # Relationships
     user: Mapped["User"] = relationship(back_populates="starred_questions")
     question: Mapped["Question"] = relationship()
 
+class RevisionItem(Base):
+    __tablename__ = 'revision_items'
+    __table_args__ = (
+        # The per-user queue: "next N due" is a range read on this index
+        Index('ix_revision_items_user_due', 'user_id', 'due_at'),
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
+    question_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('questions.question_id'), primary_key=True)
+    source: Mapped[RevisionSourceEnum] = mapped_column(Enum(RevisionSourceEnum))
+    due_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    interval_days: Mapped[float] = mapped_column(Float, default=0)
+    ease_factor: Mapped[float] = mapped_column(Float, default=2.5)
+    repetitions: Mapped[int] = mapped_column(Integer, default=0)
+    last_reviewed_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    # Relationships
+    question: Mapped["Question"] = relationship()
+
 
 # Analytics Aggregate Tables
 class UserSubjectAnalytics(Base):
     __tablename__ = 'user_subject_analytics'
-    user_id: Mapped[str] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
     exam_id: Mapped[int] = mapped_column(ForeignKey('exams.exam_id'), primary_key=True)
     subject_id: Mapped[int] = mapped_column(ForeignKey('subjects.subject_id'), primary_key=True)
     questions_attempted: Mapped[int] = mapped_column(Integer, default=0)
@@ -248,7 +299,7 @@ class UserSubjectAnalytics(Base):
 
 class UserChapterAnalytics(Base):
     __tablename__ = 'user_chapter_analytics'
-    user_id: Mapped[str] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
     exam_id: Mapped[int] = mapped_column(ForeignKey('exams.exam_id'), primary_key=True)
     chapter_id: Mapped[int] = mapped_column(ForeignKey('chapters.chapter_id'), primary_key=True)
     questions_attempted: Mapped[int] = mapped_column(Integer, default=0)
@@ -261,7 +312,7 @@ class UserChapterAnalytics(Base):
 
 class UserQuestionTypeAnalytics(Base):
     __tablename__ = 'user_question_type_analytics'
-    user_id: Mapped[str] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
+    user_id: Mapped[uuid.UUID] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
     exam_id: Mapped[int] = mapped_column(ForeignKey('exams.exam_id'), primary_key=True)
     question_type: Mapped[str] = mapped_column(String, primary_key=True) # Storing enum name as string
     questions_attempted: Mapped[int] = mapped_column(Integer, default=0)
@@ -271,6 +322,12 @@ class UserQuestionTypeAnalytics(Base):
     # Relationships
     user: Mapped["User"] = relationship(back_populates="question_type_analytics")
 
+# Dashboards - the materialized views themselves are created in migrations, see app/dashboards.py
+class MaterializedViewRefresh(Base):
+    __tablename__ = 'materialized_view_refreshes'
+    view_name: Mapped[str] = mapped_column(String, primary_key=True)
+    refreshed_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
 # AI & RAG Support Tables
 class SourceMaterialChunk(Base):
     __tablename__ = 'source_material_chunks'
@@ -0,0 +1,243 @@
+"""
+Monthly partitions of test_answers and test_answer_selections.
+
+Both tables are range-partitioned on test_created_at (the parent test's creation
+time), one partition per month. Partitions are created ahead of time (at startup
+and then every PARTITION_CHECK_SECONDS) and old ones are exported to Parquet and
+dropped by the archive command.
+
+    python -m app.partitions ensure [--months-ahead 3]
+    python -m app.partitions archive --before 2026-01 --out archive/
+"""
+import argparse
+import asyncio
+import logging
+import re
+from datetime import date, datetime
+from pathlib import Path
+
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from . import models
+from .columnar import stream_to_parquet
+from .config import settings
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+# Parent tables, in creation order (selections reference answers)
+PARTITIONED_TABLES = ("test_answers", "test_answer_selections")
+
+PARTITION_NAME = re.compile(r"^(?P<table>test_answers|test_answer_selections)_y(?P<year>\d{4})m(?P<month>\d{2})$")
+
+# Serialises partition DDL between workers starting at the same time
+PARTITION_LOCK_ID = 7_312_004
+
+EXPORT_QUERIES = {
+    "test_answers": (
+        "SELECT answer_id::text AS answer_id, test_created_at, test_id::text AS test_id, "
+        "question_id::text AS question_id, integer_answer, status::text AS status, time_taken_seconds "
+        'FROM "{partition}"'
+    ),
+    "test_answer_selections": (
+        "SELECT answer_id::text AS answer_id, test_created_at, selected_option_id::text AS selected_option_id "
+        'FROM "{partition}"'
+    ),
+}
+
+
+def export_schema(table: str):
+    import pyarrow as pa
+
+    if table == "test_answers":
+        return pa.schema([
+            ("answer_id", pa.string()),
+            ("test_created_at", pa.timestamp("us")),
+            ("test_id", pa.string()),
+            ("question_id", pa.string()),
+            ("integer_answer", pa.int32()),
+            ("status", pa.string()),
+            ("time_taken_seconds", pa.int32()),
+        ])
+    return pa.schema([
+        ("answer_id", pa.string()),
+        ("test_created_at", pa.timestamp("us")),
+        ("selected_option_id", pa.string()),
+    ])
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+async def ensure_partitions(conn: AsyncConnection, months_ahead: int):
+    """
+    Create the partitions for the current month and the next `months_ahead` months if missing.
+    Idempotent and safe to run from several workers at once.
+    """
+    await conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": PARTITION_LOCK_ID})
+    this_month = date.today().replace(day=1)
+    for offset in range(months_ahead + 1):
+        await create_partitions(conn, add_months(this_month, offset))
+
+
+async def create_partitions(conn: AsyncConnection, month: date):
+    for table in PARTITIONED_TABLES:
+        await conn.execute(text(
+            f'CREATE TABLE IF NOT EXISTS "{partition_name(table, month)}" PARTITION OF "{table}" '
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+
+
+def is_partition_name(name: str) -> bool:
+    """
+    True for monthly child tables; alembic autogenerate must ignore these (see alembic/env.py).
+    """
+    return PARTITION_NAME.match(name) is not None
+
+
+async def list_partition_months(conn: AsyncConnection, table: str) -> list[date]:
+    """
+    Months that have a partition table for `table`, attached or not - a table
+    detached by hand still needs archiving.
+    """
+    result = await conn.execute(
+        text("SELECT relname FROM pg_class WHERE relkind = 'r' AND relnamespace = current_schema()::regnamespace")
+    )
+    months = []
+    for (name,) in result:
+        match = PARTITION_NAME.match(name)
+        if match and match["table"] == table:
+            months.append(date(int(match["year"]), int(match["month"]), 1))
+    return sorted(months)
+
+
+async def is_attached(conn: AsyncConnection, partition: str) -> bool:
+    return await conn.scalar(
+        text("SELECT EXISTS (SELECT 1 FROM pg_inherits WHERE inhrelid = to_regclass(:partition))"),
+        {"partition": f'"{partition}"'},
+    )
+
+
+async def table_exists(conn: AsyncConnection, name: str) -> bool:
+    return await conn.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": f'"{name}"'})
+
+
+class OpenTestsError(Exception):
+    """
+    The month still has tests that are not COMPLETED, so answers may yet be written to it.
+    """
+
+
+async def count_open_tests(conn: AsyncConnection, month: date) -> int:
+    return await conn.scalar(
+        select(func.count()).select_from(models.Test).where(
+            models.Test.created_at >= month,
+            models.Test.created_at < add_months(month, 1),
+            models.Test.status != models.TestStatusEnum.COMPLETED,
+        )
+    )
+
+
+async def archive_month(conn: AsyncConnection, month: date, out_dir: Path) -> dict[str, int]:
+    """
+    Export one month's partitions to Parquet and drop them, all in the caller's transaction.
+
+    The partitions are locked against writes before the export, so every dropped row
+    has been exported, and a failure rolls the whole month back. Raises OpenTestsError
+    if the month still has tests that are not completed - answers written for them
+    after the drop would have no partition to go to.
+    """
+    open_tests = await count_open_tests(conn, month)
+    if open_tests:
+        raise OpenTestsError(f"{open_tests} tests created in {month:%Y-%m} are not completed")
+
+    partitions = {table: partition_name(table, month) for table in PARTITIONED_TABLES}
+    existing = {table: partition for table, partition in partitions.items() if await table_exists(conn, partition)}
+    if existing:
+        # SHARE blocks writes to this month's tables only; reads and other months carry on
+        await conn.execute(text(
+            "LOCK TABLE " + ", ".join(f'"{partition}"' for partition in existing.values()) + " IN SHARE MODE"
+        ))
+
+    counts = {}
+    for table in PARTITIONED_TABLES:
+        if table not in existing:
+            counts[table] = 0
+            continue
+        counts[table] = await stream_to_parquet(
+            conn,
+            EXPORT_QUERIES[table].format(partition=existing[table]),
+            export_schema(table),
+            out_dir / table / f"{existing[table]}.parquet",
+        )
+
+    # Selections first: once they are gone nothing references the answers partition,
+    # so detaching it passes the foreign key check
+    await conn.execute(text(f'DROP TABLE IF EXISTS "{partitions["test_answer_selections"]}"'))
+    answers = partitions["test_answers"]
+    if await is_attached(conn, answers):
+        await conn.execute(text(f'ALTER TABLE test_answers DETACH PARTITION "{answers}"'))
+    await conn.execute(text(f'DROP TABLE IF EXISTS "{answers}"'))
+    return counts
+
+
+async def archive(before: date, out_dir: Path):
+    async with engine.connect() as conn:
+        months = set()
+        for table in PARTITIONED_TABLES:
+            months.update(m for m in await list_partition_months(conn, table) if m < before)
+    for month in sorted(months):
+        try:
+            async with engine.begin() as conn:
+                counts = await archive_month(conn, month, out_dir)
+        except OpenTestsError as exc:
+            print(f"skipped {month:%Y-%m}: {exc}")
+            continue
+        print(f"archived {month:%Y-%m}: " + ", ".join(f"{count} {table}" for table, count in counts.items()))
+
+
+async def run_ensure_loop(interval_seconds: float):
+    """
+    Keeps upcoming partitions in place for long-running workers; started from the app lifespan.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await ensure(settings.PARTITION_MONTHS_AHEAD)
+        except Exception:
+            logger.exception("Failed to create upcoming partitions")
+
+
+async def ensure(months_ahead: int):
+    async with engine.begin() as conn:
+        await ensure_partitions(conn, months_ahead)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage test_answers partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    ensure_parser = commands.add_parser("ensure", help="create upcoming monthly partitions")
+    ensure_parser.add_argument("--months-ahead", type=int, default=settings.PARTITION_MONTHS_AHEAD)
+
+    archive_parser = commands.add_parser("archive", help="export and drop old partitions")
+    archive_parser.add_argument("--before", required=True, help="archive months before this one (YYYY-MM)")
+    archive_parser.add_argument("--out", type=Path, required=True, help="directory for the Parquet files")
+
+    args = parser.parse_args()
+    if args.command == "ensure":
+        asyncio.run(ensure(args.months_ahead))
+    else:
+        before = datetime.strptime(args.before, "%Y-%m").date()
+        asyncio.run(archive(before, args.out))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import time
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict
+
+
+class LimiterBackend(ABC):
+    """
+    Storage for token buckets. Subclass this to share buckets between workers
+    (e.g. in Redis); LocalLimiterBackend is the in-process stand-in.
+    """
+
+    @abstractmethod
+    def take(self, key: str, capacity: float, refill_per_second: float, now: float) -> float:
+        """
+        Try to take one token from the bucket at `key`.
+        Returns 0 if a token was taken, otherwise the seconds until one is available.
+        """
+
+
+class LocalLimiterBackend(LimiterBackend):
+    """
+    Per-process token buckets, bounded with LRU eviction. An evicted bucket simply
+    starts full again, so eviction can only make the limiter more lenient.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, key: str, capacity: float, refill_per_second: float, now: float) -> float:
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+
+        if tokens >= 1:
+            tokens -= 1
+            retry_after = 0.0
+        else:
+            retry_after = (1 - tokens) / refill_per_second
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class LoginLimiter:
+    """
+    Token buckets keyed by email and by client IP, checked before any DB lookup
+    or password hash verification on /login.
+    """
+
+    def __init__(self, backend: LimiterBackend, per_email: int, per_ip: int, window_seconds: int):
+        self.backend = backend
+        self.per_email = per_email
+        self.per_ip = per_ip
+        self.window_seconds = window_seconds
+        self.counters: Counter[str] = Counter()
+
+    def check(self, email: str, client_ip: str | None) -> int:
+        """
+        Charge one attempt to both buckets.
+        Returns 0 if the attempt may proceed, otherwise the Retry-After in whole seconds.
+        """
+        now = time.monotonic()
+        # Charge both buckets even if one rejects, so a blocked IP can't keep probing emails for free
+        retry_email = self.backend.take(
+            f"login:email:{email.strip().lower()}", self.per_email, self.per_email / self.window_seconds, now
+        )
+        retry_ip = 0.0
+        if client_ip:
+            retry_ip = self.backend.take(
+                f"login:ip:{client_ip}", self.per_ip, self.per_ip / self.window_seconds, now
+            )
+
+        if retry_email:
+            self.counters["rejected_email"] += 1
+        if retry_ip:
+            self.counters["rejected_ip"] += 1
+        retry_after = max(retry_email, retry_ip)
+        if retry_after:
+            self.counters["rejected"] += 1
+            return max(1, int(retry_after + 0.999))
+        self.counters["allowed"] += 1
+        return 0
@@ -0,0 +1,107 @@
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+
+# SM-2 constants
+MIN_EASE_FACTOR = 1.3
+RELEARN_DELAY = timedelta(minutes=10)
+
+
+def schedule_next(item: models.RevisionItem, quality: int, now: datetime) -> dict:
+    """
+    Compute the next state of a revision item after a review graded 0-5 (SM-2).
+    Returns the new column values rather than mutating the item so the caller can
+    batch them into a single UPDATE.
+    """
+    ease = item.ease_factor + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    ease = max(MIN_EASE_FACTOR, ease)
+
+    if quality < 3:
+        # Forgotten - start over and show it again shortly
+        repetitions = 0
+        interval_days = 0.0
+        due_at = now + RELEARN_DELAY
+    else:
+        repetitions = item.repetitions + 1
+        if repetitions == 1:
+            interval_days = 1.0
+        elif repetitions == 2:
+            interval_days = 6.0
+        else:
+            interval_days = item.interval_days * ease
+        due_at = now + timedelta(days=interval_days)
+
+    return {
+        "user_id": item.user_id,
+        "question_id": item.question_id,
+        "ease_factor": ease,
+        "repetitions": repetitions,
+        "interval_days": interval_days,
+        "due_at": due_at,
+        "last_reviewed_at": now,
+    }
+
+
+async def enqueue_questions(db: AsyncSession, user_id: uuid.UUID, question_ids: list[uuid.UUID], source: models.RevisionSourceEnum):
+    """
+    Schedule questions for immediate review. Questions already in the queue keep their
+    schedule and source, so an INCORRECT item is never downgraded to STARRED. Does not commit.
+    """
+    if not question_ids:
+        return
+    now = datetime.utcnow()
+    await db.execute(
+        pg_insert(models.RevisionItem)
+        .values([
+            {"user_id": user_id, "question_id": qid, "source": source, "due_at": now, "created_at": now}
+            for qid in question_ids
+        ])
+        .on_conflict_do_nothing(index_elements=["user_id", "question_id"])
+    )
+
+
+async def enqueue_incorrect_answers(db: AsyncSession, user_id: uuid.UUID, test_id: uuid.UUID, test_created_at: datetime):
+    """
+    Schedule every incorrectly answered question of a finished test, as one
+    INSERT ... SELECT so the answers never leave the database. Does not commit.
+
+    A question already in the queue (e.g. starred earlier) is switched to source
+    INCORRECT and made due again, since getting it wrong means it was forgotten.
+    """
+    now = datetime.utcnow()
+    incorrect = (
+        select(
+            literal(user_id),
+            models.TestAnswer.question_id,
+            literal(models.RevisionSourceEnum.INCORRECT, type_=models.RevisionItem.__table__.c.source.type),
+            literal(now),
+            literal(now),
+        )
+        .where(
+            # Lets Postgres prune to the single partition holding this test's answers
+            models.TestAnswer.test_created_at == test_created_at,
+            models.TestAnswer.test_id == test_id,
+            models.TestAnswer.status == models.TestAnswerStatusEnum.INCORRECT,
+        )
+        # No DISTINCT: uq_test_answers_test_question already makes the rows unique, and
+        # under DISTINCT Postgres would resolve the untyped source parameter to text
+    )
+    insert = pg_insert(models.RevisionItem).from_select(
+        ["user_id", "question_id", "source", "due_at", "created_at"], incorrect
+    )
+    await db.execute(
+        insert.on_conflict_do_update(
+            index_elements=["user_id", "question_id"],
+            set_={
+                "source": insert.excluded.source,
+                "due_at": insert.excluded.due_at,
+                "repetitions": 0,
+                "interval_days": 0,
+            },
+        )
+    )
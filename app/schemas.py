@@ -1,4 +1,9 @@
-from pydantic import BaseModel, EmailStr
+import uuid
+from datetime import datetime
+
+from typing import Annotated, Literal, Union
+
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -6,7 +11,7 @@ class UserCreate(BaseModel):
     name: str
 
 class UserPublic(BaseModel):
-    user_id: str
+    user_id: uuid.UUID
     email: EmailStr
     name: str
 
@@ -24,4 +29,106 @@ class TokenData(BaseModel):
 
 class RegisterResponse(BaseModel):
     user_info: UserPublic  # This key will contain a UserPublic object
-    token: Token
\ No newline at end of file
+    token: Token
+
+# Starred questions
+class StarToggleRequest(BaseModel):
+    star: list[uuid.UUID] = Field(default_factory=list, max_length=500)
+    unstar: list[uuid.UUID] = Field(default_factory=list, max_length=500)
+
+class StarToggleResponse(BaseModel):
+    starred: list[uuid.UUID]
+    unstarred: list[uuid.UUID]
+
+class StarredQuestion(BaseModel):
+    question_id: uuid.UUID
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class StarredQuestionPage(BaseModel):
+    items: list[StarredQuestion]
+    next_cursor: str | None = None  # Pass back as ?cursor= to get the next page
+
+
+# Revision (spaced repetition) queue
+class RevisionQuestion(BaseModel):
+    question_id: uuid.UUID
+    question_text: str
+    question_type: str
+    due_at: datetime
+    repetitions: int
+    is_starred: bool
+
+class RevisionResult(BaseModel):
+    question_id: uuid.UUID
+    quality: int = Field(ge=0, le=5)  # SM-2 grade: 0 = blackout, 5 = perfect recall
+
+class RevisionResultsRequest(BaseModel):
+    results: list[RevisionResult] = Field(max_length=500)
+
+class RevisionResultsResponse(BaseModel):
+    updated: int
+
+
+# Live test session messages (client -> server)
+class LiveAuth(BaseModel):
+    type: Literal["auth"]
+    token: str
+
+class LiveAnswerDelta(BaseModel):
+    type: Literal["answer"]
+    question_id: uuid.UUID
+    selected_option_ids: list[uuid.UUID] = Field(default_factory=list, max_length=10)
+    integer_answer: int | None = None
+    marked_for_review: bool = False
+    time_taken_seconds: int = Field(default=0, ge=0)
+
+class LiveStatusChange(BaseModel):
+    type: Literal["status"]
+    status: Literal["IN_PROGRESS", "PAUSED", "COMPLETED"]
+
+LiveClientMessage = TypeAdapter(
+    Annotated[Union[LiveAnswerDelta, LiveStatusChange], Field(discriminator="type")]
+)
+
+
+# Dashboards - every response carries the refresh time of the view it was read from
+class ChapterAccuracy(BaseModel):
+    exam_id: int
+    chapter_id: int
+    subject_id: int
+    users: int
+    questions_attempted: int
+    correct_answers: int
+    accuracy: float | None
+    avg_time_seconds: float | None
+
+class ChapterAccuracyResponse(BaseModel):
+    refreshed_at: datetime | None
+    items: list[ChapterAccuracy]
+
+class QuestionTypeAccuracy(BaseModel):
+    exam_id: int
+    question_type: str
+    users: int
+    questions_attempted: int
+    correct_answers: int
+    accuracy: float | None
+
+class QuestionTypeAccuracyResponse(BaseModel):
+    refreshed_at: datetime | None
+    items: list[QuestionTypeAccuracy]
+
+class QuestionDifficulty(BaseModel):
+    question_id: uuid.UUID
+    difficulty_level: str | None
+    attempts: int
+    correct_answers: int
+    accuracy: float
+    avg_time_seconds: float | None
+
+class QuestionDifficultyResponse(BaseModel):
+    refreshed_at: datetime | None
+    items: list[QuestionDifficulty]
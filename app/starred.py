@@ -0,0 +1,91 @@
+import base64
+import time
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import models
+from .config import settings
+
+
+class StarredCache:
+    """
+    Bounded LRU of user_id -> set of starred question ids.
+
+    Lets the review endpoints flag every question as starred or not
+    without running a query per question. Entries are loaded lazily on first use
+    and kept in sync by the toggle endpoint of this worker. Toggles made on other
+    workers aren't seen, so entries expire `ttl_seconds` after they were loaded.
+    """
+
+    def __init__(self, max_users: int, ttl_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.max_users = max_users
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._sets: OrderedDict[uuid.UUID, tuple[float, set[uuid.UUID]]] = OrderedDict()
+
+    def get(self, user_id: uuid.UUID) -> set[uuid.UUID] | None:
+        entry = self._sets.get(user_id)
+        if entry is None:
+            return None
+        loaded_at, starred = entry
+        if self._clock() - loaded_at >= self.ttl_seconds:
+            del self._sets[user_id]
+            return None
+        self._sets.move_to_end(user_id)
+        return starred
+
+    def put(self, user_id: uuid.UUID, starred: set[uuid.UUID]):
+        self._sets[user_id] = (self._clock(), starred)
+        self._sets.move_to_end(user_id)
+        while len(self._sets) > self.max_users:
+            self._sets.popitem(last=False)
+
+    def apply(self, user_id: uuid.UUID, starred: list[uuid.UUID], unstarred: list[uuid.UUID]):
+        # Only patch sets we already hold; a missing user is loaded fresh on next read.
+        # Patching keeps the load time - the set may still miss other workers' toggles.
+        entry = self._sets.get(user_id)
+        if entry is None:
+            return
+        current = entry[1]
+        current.update(starred)
+        current.difference_update(unstarred)
+
+    def invalidate(self, user_id: uuid.UUID):
+        self._sets.pop(user_id, None)
+
+
+starred_cache = StarredCache(settings.STARRED_CACHE_MAX_USERS, settings.STARRED_CACHE_TTL_SECONDS)
+
+
+async def get_starred_ids(db: AsyncSession, user_id: uuid.UUID) -> set[uuid.UUID]:
+    """
+    Return the set of question ids starred by the user, from the cache when possible.
+    """
+    starred = starred_cache.get(user_id)
+    if starred is None:
+        result = await db.execute(
+            select(models.UserStarredQuestion.question_id)
+            .where(models.UserStarredQuestion.user_id == user_id)
+        )
+        starred = set(result.scalars().all())
+        starred_cache.put(user_id, starred)
+    return starred
+
+
+def encode_cursor(created_at: datetime, question_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{question_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    """
+    Inverse of encode_cursor. Raises ValueError on a malformed cursor.
+    """
+    raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+    created_at, question_id = raw.split("|", 1)
+    return datetime.fromisoformat(created_at), uuid.UUID(question_id)
@@ -0,0 +1,46 @@
+"""
+Password hashing throughput of a single worker.
+
+Reports the bcrypt cost this machine would calibrate to and how many
+hashes (register) / verifies (login) per second one worker can sustain.
+
+    python -m benchmarks.hash_throughput [--seconds 5] [--rounds 12]
+"""
+import argparse
+import time
+
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.hashing import calibrate_bcrypt_rounds
+
+
+def measure(fn, seconds: float) -> float:
+    count = 0
+    start = time.perf_counter()
+    while (elapsed := time.perf_counter() - start) < seconds:
+        fn()
+        count += 1
+    return count / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each measurement")
+    parser.add_argument("--rounds", type=int, default=None, help="bcrypt cost (default: calibrate)")
+    args = parser.parse_args()
+
+    rounds = args.rounds or calibrate_bcrypt_rounds(settings.PASSWORD_HASH_TARGET_MS, settings.BCRYPT_MIN_ROUNDS)
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+    stored = context.hash("benchmark-password")
+
+    hash_rate = measure(lambda: context.hash("benchmark-password"), args.seconds)
+    verify_rate = measure(lambda: context.verify("benchmark-password", stored), args.seconds)
+
+    print(f"bcrypt rounds:      {rounds} (target {settings.PASSWORD_HASH_TARGET_MS} ms)")
+    print(f"hashes / second:    {hash_rate:.2f} ({1000 / hash_rate:.1f} ms each)")
+    print(f"verifies / second:  {verify_rate:.2f} ({1000 / verify_rate:.1f} ms each)")
+
+
+if __name__ == "__main__":
+    main()
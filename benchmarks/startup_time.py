@@ -0,0 +1,62 @@
+"""
+Worker startup time.
+
+Measures how long `import app.main` takes, and how long a fresh uvicorn worker
+takes from launch until it answers its first /health request (which needs the
+database). Needs a reachable DATABASE_URL.
+
+    python -m benchmarks.startup_time [--runs 5] [--port 8765]
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def time_import() -> float:
+    out = subprocess.run(
+        [sys.executable, "-c",
+         "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"],
+        check=True, capture_output=True, text=True,
+    )
+    return float(out.stdout.strip())
+
+
+def time_first_request(port: int, timeout: float = 60.0) -> float:
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "--factory", "app.main:create_app", "--port", str(port)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=5) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.01)
+        raise TimeoutError("server did not become ready")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    imports = [time_import() for _ in range(args.runs)]
+    first_requests = [time_first_request(args.port) for _ in range(args.runs)]
+
+    print(f"import app.main:           median {statistics.median(imports) * 1000:.0f} ms")
+    print(f"launch to first /health:   median {statistics.median(first_requests) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
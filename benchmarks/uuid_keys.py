@@ -0,0 +1,111 @@
+"""
+Text vs native UUID keys.
+
+Seeds the same users/tests/answers/selections dataset into two scratch schemas,
+one keyed by uuid4 strings in text columns (the old layout) and one keyed by
+time-ordered native uuids (the current layout), then reports index sizes and
+the latency of the per-user answers join. Needs a reachable DATABASE_URL; the
+scratch schemas are dropped afterwards.
+
+    python -m benchmarks.uuid_keys [--users 2000] [--tests-per-user 20] [--answers-per-test 30]
+"""
+import argparse
+import random
+import statistics
+import time
+
+import psycopg
+
+from app.config import settings
+
+# id expressions for each layout; `n` is the row number from generate_series
+LAYOUTS = {
+    "text": ("text", "gen_random_uuid()::text"),
+    # 48-bit millisecond prefix + random tail, the same ordering properties as app.ids.uuid7
+    "uuid": ("uuid", "(lpad(to_hex((extract(epoch from clock_timestamp()) * 1000)::bigint * 1000 + n), 14, '0')"
+                     " || substr(md5(random()::text), 1, 18))::uuid"),
+}
+
+# One statement per execute: psycopg binds parameters server-side, which allows
+# only a single statement per parameterized query
+SCHEMA_STATEMENTS = [
+    "CREATE SCHEMA {schema}",
+    "CREATE TABLE {schema}.users (user_id {key} PRIMARY KEY, seq int)",
+    "CREATE TABLE {schema}.tests (test_id {key} PRIMARY KEY, user_id {key} REFERENCES {schema}.users, seq int)",
+    "CREATE TABLE {schema}.test_answers (answer_id {key} PRIMARY KEY, test_id {key} REFERENCES {schema}.tests, seq int)",
+    """CREATE TABLE {schema}.test_answer_selections (
+        answer_id {key} REFERENCES {schema}.test_answers, option_id {key}, PRIMARY KEY (answer_id, option_id)
+    )""",
+    "INSERT INTO {schema}.users SELECT {id}, n FROM generate_series(1, %(users)s) n",
+    """INSERT INTO {schema}.tests
+        SELECT {id}, u.user_id, n FROM {schema}.users u, generate_series(1, %(tests)s) n""",
+    "CREATE INDEX ON {schema}.tests (user_id)",
+    """INSERT INTO {schema}.test_answers
+        SELECT {id}, t.test_id, n FROM {schema}.tests t, generate_series(1, %(answers)s) n""",
+    "CREATE INDEX ON {schema}.test_answers (test_id)",
+    """INSERT INTO {schema}.test_answer_selections
+        SELECT a.answer_id, {id} FROM {schema}.test_answers a, generate_series(1, 1) n""",
+    "ANALYZE {schema}.users, {schema}.tests, {schema}.test_answers, {schema}.test_answer_selections",
+]
+
+JOIN_SQL = """
+SELECT count(*) FROM {schema}.tests t
+JOIN {schema}.test_answers a ON a.test_id = t.test_id
+JOIN {schema}.test_answer_selections s ON s.answer_id = a.answer_id
+WHERE t.user_id = %(user_id)s
+"""
+
+
+def sync_url(url: str) -> str:
+    return url.replace("postgresql+psycopg://", "postgresql://", 1)
+
+
+def run_layout(conn, name: str, args) -> dict:
+    schema = f"bench_keys_{name}"
+    key, id_expr = LAYOUTS[name]
+    with conn.cursor() as cur:
+        cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE")
+        params = {"users": args.users, "tests": args.tests_per_user, "answers": args.answers_per_test}
+        for statement in SCHEMA_STATEMENTS:
+            cur.execute(statement.format(schema=schema, key=key, id=id_expr), params)
+
+        sizes = {}
+        for table in ("tests", "test_answers", "test_answer_selections"):
+            cur.execute("SELECT pg_indexes_size(%s)", (f"{schema}.{table}",))
+            sizes[table] = cur.fetchone()[0]
+
+        cur.execute(f"SELECT user_id FROM {schema}.users")
+        user_ids = [row[0] for row in cur.fetchall()]
+        timings = []
+        for user_id in random.sample(user_ids, min(args.queries, len(user_ids))):
+            start = time.perf_counter()
+            cur.execute(JOIN_SQL.format(schema=schema), {"user_id": user_id})
+            cur.fetchone()
+            timings.append(time.perf_counter() - start)
+
+        cur.execute(f"DROP SCHEMA {schema} CASCADE")
+    return {"sizes": sizes, "timings": timings}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--tests-per-user", type=int, default=20)
+    parser.add_argument("--answers-per-test", type=int, default=30)
+    parser.add_argument("--queries", type=int, default=500)
+    args = parser.parse_args()
+
+    with psycopg.connect(sync_url(settings.DATABASE_URL), autocommit=True) as conn:
+        results = {name: run_layout(conn, name, args) for name in LAYOUTS}
+
+    for name, result in results.items():
+        print(f"[{name} keys]")
+        for table, size in result["sizes"].items():
+            print(f"  {table + ' indexes:':32} {size / 1024 / 1024:8.1f} MiB")
+        timings = sorted(result["timings"])
+        print(f"  {'join latency p50:':32} {statistics.median(timings) * 1000:8.2f} ms")
+        print(f"  {'join latency p95:':32} {timings[int(len(timings) * 0.95) - 1] * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
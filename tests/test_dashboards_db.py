@@ -0,0 +1,46 @@
+import random
+
+from sqlalchemy import insert, select, text
+
+from app import dashboards, models
+
+MCSC = [("a", True), ("b", False)]
+
+
+def test_cohort_views_aggregate_graded_answers(pg, seed):
+    async def check(db):
+        test, questions = await seed(db, {
+            "right": (models.QuestionType.MCSC, MCSC),
+            "wrong": (models.QuestionType.MCSC, MCSC),
+            "ungraded": (models.QuestionType.MCSC, MCSC),
+        })
+        exam = models.Exam(exam_id=random.randint(1, 2**31 - 1), exam_name=f"exam-{test.test_id}")
+        db.add(exam)
+        await db.flush()
+        statuses = {
+            "right": models.TestAnswerStatusEnum.CORRECT,
+            "wrong": models.TestAnswerStatusEnum.INCORRECT,
+            "ungraded": models.TestAnswerStatusEnum.UNATTEMPTED,
+        }
+        for label, (question, _) in questions.items():
+            await db.execute(insert(models.QuestionExamApplicability).values(question_id=question.question_id, exam_id=exam.exam_id))
+            await db.execute(insert(models.TestAnswer).values(
+                test_created_at=test.created_at, test_id=test.test_id, question_id=question.question_id,
+                status=statuses[label], time_taken_seconds=10,
+            ))
+
+        rows = {}
+        for view in (dashboards.chapter_accuracy, dashboards.question_type_accuracy):
+            await db.execute(text(f"REFRESH MATERIALIZED VIEW {view.name}"))
+            result = await db.execute(select(view).where(view.c.exam_id == exam.exam_id))
+            rows[view.name] = result.mappings().all()
+        return rows
+
+    rows = pg(check)
+    [chapter] = rows["mv_cohort_chapter_accuracy"]
+    assert (chapter["users"], chapter["questions_attempted"], chapter["correct_answers"]) == (1, 2, 1)
+    assert chapter["accuracy"] == 0.5
+    assert chapter["avg_time_seconds"] == 10
+    [question_type] = rows["mv_cohort_question_type_accuracy"]
+    assert question_type["question_type"] == "MCSC"
+    assert (question_type["questions_attempted"], question_type["correct_answers"]) == (2, 1)
@@ -0,0 +1,76 @@
+import uuid
+
+import pytest
+from sqlalchemy import insert, select
+
+from app import models
+from app.grading import grade_answer, grade_test
+
+A, B, C = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+CORRECT = models.TestAnswerStatusEnum.CORRECT
+INCORRECT = models.TestAnswerStatusEnum.INCORRECT
+UNATTEMPTED = models.TestAnswerStatusEnum.UNATTEMPTED
+
+
+def options(*correct, text=None):
+    return [models.QuestionOption(option_id=option_id, option_text=text, is_correct=True) for option_id in correct]
+
+
+@pytest.mark.parametrize("question_type, selected, integer_answer, correct_options, expected", [
+    (models.QuestionType.MCSC, {A}, None, options(A), CORRECT),
+    (models.QuestionType.MCSC, {B}, None, options(A), INCORRECT),
+    (models.QuestionType.MCMC, {A, B}, None, options(A, B), CORRECT),
+    # No partial credit
+    (models.QuestionType.MCMC, {A}, None, options(A, B), INCORRECT),
+    (models.QuestionType.MCMC, {A, B, C}, None, options(A, B), INCORRECT),
+    (models.QuestionType.MCMC, set(), None, options(A, B), UNATTEMPTED),
+    (models.QuestionType.MCSC, set(), None, options(A), UNATTEMPTED),
+    # INT/NUM answers are compared with the text of the correct option
+    (models.QuestionType.INT, set(), 42, options(A, text="42"), CORRECT),
+    (models.QuestionType.INT, set(), 41, options(A, text="42"), INCORRECT),
+    (models.QuestionType.NUM, set(), 3, options(A, text="3.0"), CORRECT),
+    (models.QuestionType.INT, set(), None, options(A, text="42"), UNATTEMPTED),
+    (models.QuestionType.INT, set(), 42, options(A, text="forty-two"), INCORRECT),
+    (models.QuestionType.INT, set(), 42, [], INCORRECT),
+])
+def test_grade_answer(question_type, selected, integer_answer, correct_options, expected):
+    assert grade_answer(question_type, selected, integer_answer, correct_options) == expected
+
+
+def test_grade_test_sets_statuses_and_score(pg, seed):
+    async def check(db):
+        test, questions = await seed(db, {
+            "right": (models.QuestionType.MCSC, [("a", True), ("b", False)]),
+            "wrong": (models.QuestionType.MCMC, [("a", True), ("b", True), ("c", False)]),
+            "skipped": (models.QuestionType.MCSC, [("a", True), ("b", False)]),
+            "numeric": (models.QuestionType.INT, [("7", True)]),
+        })
+        picks = {"right": [0], "wrong": [0], "skipped": [], "numeric": []}
+        for label, (question, question_options) in questions.items():
+            answer_id = await db.scalar(
+                insert(models.TestAnswer)
+                .values(
+                    test_created_at=test.created_at, test_id=test.test_id, question_id=question.question_id,
+                    integer_answer=7 if label == "numeric" else None,
+                )
+                .returning(models.TestAnswer.answer_id)
+            )
+            for index in picks[label]:
+                await db.execute(insert(models.TestAnswerSelection).values(
+                    answer_id=answer_id, test_created_at=test.created_at,
+                    selected_option_id=question_options[index].option_id,
+                ))
+
+        score = await grade_test(db, test.test_id, test.created_at)
+        result = await db.execute(
+            select(models.Question.question_text, models.TestAnswer.status)
+            .join(models.Question, models.Question.question_id == models.TestAnswer.question_id)
+            .where(models.TestAnswer.test_id == test.test_id)
+        )
+        final_score = await db.scalar(select(models.Test.final_score).where(models.Test.test_id == test.test_id))
+        return score, dict(result.all()), final_score
+
+    score, statuses, final_score = pg(check)
+    assert statuses == {"right": CORRECT, "wrong": INCORRECT, "skipped": UNATTEMPTED, "numeric": CORRECT}
+    # Default marks: +4 per correct answer, -1 per incorrect one
+    assert score == final_score == 4 + 4 - 1
@@ -0,0 +1,110 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app import live, models, schemas
+from app.live import MAX_WRITE_ATTEMPTS, AnswerBatcher, AnswerWriteError
+
+CREATED_AT = datetime(2026, 10, 19, 9, 0)
+
+
+def delta(question_id, **fields):
+    return schemas.LiveAnswerDelta(type="answer", question_id=question_id, **fields)
+
+
+@pytest.fixture
+def writes(monkeypatch):
+    """
+    Records the batches passed to write_answers; batches containing a test in
+    `writes.failing` raise instead.
+    """
+    class Writes(list):
+        failing = set()
+
+    recorded = Writes()
+
+    async def write_answers(batch):
+        await asyncio.sleep(0)
+        if any(row["test_id"] in recorded.failing for row in batch):
+            raise RuntimeError("write failed")
+        recorded.append(batch)
+
+    monkeypatch.setattr(live, "write_answers", write_answers)
+    return recorded
+
+
+def test_deltas_are_coalesced_per_question(writes):
+    batcher = AnswerBatcher(interval_seconds=1, max_pending=100)
+    test_id, question_id = uuid.uuid4(), uuid.uuid4()
+    batcher.add(test_id, CREATED_AT, delta(question_id, integer_answer=1))
+    batcher.add(test_id, CREATED_AT, delta(question_id, integer_answer=2, marked_for_review=True))
+    batcher.add(test_id, CREATED_AT, delta(uuid.uuid4()))
+
+    asyncio.run(batcher.flush())
+    [batch] = writes
+    assert len(batch) == 2
+    latest = next(row for row in batch if row["question_id"] == question_id)
+    assert latest["integer_answer"] == 2
+    assert latest["status"] == models.TestAnswerStatusEnum.MARKED_FOR_REVIEW
+
+
+def test_flush_of_one_test_leaves_the_others_pending(writes):
+    batcher = AnswerBatcher(interval_seconds=1, max_pending=100)
+    test_id, other_test_id = uuid.uuid4(), uuid.uuid4()
+    batcher.add(test_id, CREATED_AT, delta(uuid.uuid4()))
+    batcher.add(other_test_id, CREATED_AT, delta(uuid.uuid4()))
+
+    asyncio.run(batcher.flush(test_id))
+    asyncio.run(batcher.flush())
+    assert [[row["test_id"] for row in batch] for batch in writes] == [[test_id], [other_test_id]]
+
+
+def test_failed_test_is_put_back_without_blocking_others(writes):
+    batcher = AnswerBatcher(interval_seconds=1, max_pending=100)
+    bad_test_id, good_test_id = uuid.uuid4(), uuid.uuid4()
+    writes.failing = {bad_test_id}
+    batcher.add(bad_test_id, CREATED_AT, delta(uuid.uuid4()))
+    batcher.add(good_test_id, CREATED_AT, delta(uuid.uuid4()))
+
+    with pytest.raises(AnswerWriteError):
+        asyncio.run(batcher.flush())
+    assert [[row["test_id"] for row in batch] for batch in writes] == [[good_test_id]]
+
+    writes.failing = set()
+    asyncio.run(batcher.flush())
+    assert [row["test_id"] for row in writes[-1]] == [bad_test_id]
+
+
+def test_put_back_keeps_newer_delta(writes):
+    batcher = AnswerBatcher(interval_seconds=1, max_pending=100)
+    test_id, question_id = uuid.uuid4(), uuid.uuid4()
+    writes.failing = {test_id}
+    batcher.add(test_id, CREATED_AT, delta(question_id, integer_answer=1))
+
+    async def flush_while_answering():
+        flush = asyncio.create_task(batcher.flush())
+        await asyncio.sleep(0)
+        batcher.add(test_id, CREATED_AT, delta(question_id, integer_answer=2))
+        with pytest.raises(AnswerWriteError):
+            await flush
+
+    asyncio.run(flush_while_answering())
+    writes.failing = set()
+    asyncio.run(batcher.flush())
+    assert [row["integer_answer"] for row in writes[-1]] == [2]
+
+
+def test_unwritable_rows_are_dropped_after_max_attempts(writes):
+    batcher = AnswerBatcher(interval_seconds=1, max_pending=100)
+    test_id = uuid.uuid4()
+    writes.failing = {test_id}
+    batcher.add(test_id, CREATED_AT, delta(uuid.uuid4()))
+
+    for _ in range(MAX_WRITE_ATTEMPTS):
+        with pytest.raises(AnswerWriteError):
+            asyncio.run(batcher.flush())
+    writes.failing = set()
+    asyncio.run(batcher.flush())
+    assert writes == []
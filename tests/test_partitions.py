@@ -0,0 +1,27 @@
+from datetime import date
+
+import pytest
+
+from app.partitions import add_months, is_partition_name, partition_name
+
+
+@pytest.mark.parametrize("month, offset, expected", [
+    (date(2026, 10, 1), 0, date(2026, 10, 1)),
+    (date(2026, 10, 1), 3, date(2027, 1, 1)),
+    (date(2026, 12, 1), 1, date(2027, 1, 1)),
+    (date(2026, 1, 1), -1, date(2025, 12, 1)),
+    (date(2026, 10, 1), 27, date(2029, 1, 1)),
+])
+def test_add_months(month, offset, expected):
+    assert add_months(month, offset) == expected
+
+
+def test_partition_name_round_trips_through_pattern():
+    name = partition_name("test_answer_selections", date(2026, 3, 1))
+    assert name == "test_answer_selections_y2026m03"
+    assert is_partition_name(name)
+
+
+@pytest.mark.parametrize("name", ["test_answers", "tests", "test_answers_y2026m3", "users_y2026m03"])
+def test_other_tables_are_not_partitions(name):
+    assert not is_partition_name(name)
@@ -0,0 +1,52 @@
+from datetime import date, datetime
+
+import pyarrow.parquet as pq
+import pytest
+from sqlalchemy import insert, update
+
+from app import models
+from app.partitions import OpenTestsError, archive_month, create_partitions, table_exists
+
+MONTH = date(2020, 1, 1)
+
+
+async def seed_month(db, seed, status):
+    await create_partitions(await db.connection(), MONTH)
+    test, questions = await seed(db, {"q": (models.QuestionType.MCSC, [("a", True), ("b", False)])}, created_at=datetime(2020, 1, 15))
+    question, options = questions["q"]
+    answer_id = await db.scalar(
+        insert(models.TestAnswer)
+        .values(test_created_at=test.created_at, test_id=test.test_id, question_id=question.question_id)
+        .returning(models.TestAnswer.answer_id)
+    )
+    await db.execute(insert(models.TestAnswerSelection).values(
+        answer_id=answer_id, test_created_at=test.created_at, selected_option_id=options[0].option_id,
+    ))
+    await db.execute(update(models.Test).where(models.Test.test_id == test.test_id).values(status=status))
+
+
+def test_archive_exports_then_drops_the_month(pg, seed, tmp_path):
+    async def check(db):
+        await seed_month(db, seed, models.TestStatusEnum.COMPLETED)
+        conn = await db.connection()
+        counts = await archive_month(conn, MONTH, tmp_path)
+        remaining = [await table_exists(conn, name) for name in ("test_answers_y2020m01", "test_answer_selections_y2020m01")]
+        return counts, remaining
+
+    counts, remaining = pg(check)
+    assert counts == {"test_answers": 1, "test_answer_selections": 1}
+    assert remaining == [False, False]
+    assert pq.read_table(tmp_path / "test_answers" / "test_answers_y2020m01.parquet").num_rows == 1
+    assert pq.read_table(tmp_path / "test_answer_selections" / "test_answer_selections_y2020m01.parquet").num_rows == 1
+
+
+def test_archive_refuses_month_with_open_tests(pg, seed, tmp_path):
+    async def check(db):
+        await seed_month(db, seed, models.TestStatusEnum.PAUSED)
+        conn = await db.connection()
+        with pytest.raises(OpenTestsError):
+            await archive_month(conn, MONTH, tmp_path)
+        return await table_exists(conn, "test_answers_y2020m01")
+
+    assert pg(check)
+    assert not any(tmp_path.iterdir())
@@ -0,0 +1,50 @@
+import pytest
+
+from app.ratelimit import LimiterBackend, LocalLimiterBackend, LoginLimiter
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        LimiterBackend()
+
+
+def test_bucket_allows_capacity_then_rejects():
+    backend = LocalLimiterBackend()
+    assert [backend.take("k", 3, 1.0, now=0.0) for _ in range(3)] == [0, 0, 0]
+    assert backend.take("k", 3, 1.0, now=0.0) == pytest.approx(1.0)
+
+
+def test_bucket_refills_over_time():
+    backend = LocalLimiterBackend()
+    for _ in range(2):
+        backend.take("k", 2, 0.5, now=0.0)
+    assert backend.take("k", 2, 0.5, now=1.0) == pytest.approx(1.0)
+    # The rejected attempt above spent nothing; one token is available at t=2
+    assert backend.take("k", 2, 0.5, now=2.0) == 0
+
+
+def test_buckets_are_independent_and_bounded():
+    backend = LocalLimiterBackend(max_keys=2)
+    backend.take("a", 1, 1.0, now=0.0)
+    backend.take("b", 1, 1.0, now=0.0)
+    backend.take("c", 1, 1.0, now=0.0)
+    # "a" was evicted, so it starts with a full bucket again
+    assert backend.take("a", 1, 1.0, now=0.0) == 0
+    assert backend.take("c", 1, 1.0, now=0.0) > 0
+
+
+def test_login_limiter_keys_email_case_insensitively():
+    limiter = LoginLimiter(LocalLimiterBackend(), per_email=2, per_ip=100, window_seconds=60)
+    assert limiter.check("User@Example.com", "10.0.0.1") == 0
+    assert limiter.check("user@example.com ", "10.0.0.2") == 0
+    assert limiter.check("USER@example.com", "10.0.0.3") > 0
+    assert limiter.counters["rejected_email"] == 1
+    assert limiter.counters["allowed"] == 2
+
+
+def test_login_limiter_rejects_busy_ip_for_any_email():
+    limiter = LoginLimiter(LocalLimiterBackend(), per_email=100, per_ip=2, window_seconds=60)
+    limiter.check("a@example.com", "10.0.0.1")
+    limiter.check("b@example.com", "10.0.0.1")
+    assert limiter.check("c@example.com", "10.0.0.1") > 0
+    assert limiter.check("c@example.com", "10.0.0.2") == 0
@@ -0,0 +1,46 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import models
+from app.revision import MIN_EASE_FACTOR, RELEARN_DELAY, schedule_next
+
+NOW = datetime(2026, 10, 19, 9, 0)
+
+
+def item(repetitions=0, interval_days=0.0, ease_factor=2.5):
+    return models.RevisionItem(
+        user_id=uuid.uuid4(),
+        question_id=uuid.uuid4(),
+        repetitions=repetitions,
+        interval_days=interval_days,
+        ease_factor=ease_factor,
+    )
+
+
+def test_first_two_reviews_use_fixed_intervals():
+    first = schedule_next(item(), 4, NOW)
+    assert (first["repetitions"], first["interval_days"]) == (1, 1.0)
+    second = schedule_next(item(repetitions=1, interval_days=1.0), 4, NOW)
+    assert (second["repetitions"], second["interval_days"]) == (2, 6.0)
+    assert second["due_at"] == NOW + timedelta(days=6)
+
+
+def test_later_reviews_scale_by_ease():
+    result = schedule_next(item(repetitions=2, interval_days=6.0, ease_factor=2.5), 5, NOW)
+    assert result["ease_factor"] == pytest.approx(2.6)
+    assert result["interval_days"] == pytest.approx(6.0 * 2.6)
+    assert result["last_reviewed_at"] == NOW
+
+
+def test_failed_review_restarts_soon():
+    result = schedule_next(item(repetitions=5, interval_days=30.0), 2, NOW)
+    assert result["repetitions"] == 0
+    assert result["interval_days"] == 0.0
+    assert result["due_at"] == NOW + RELEARN_DELAY
+
+
+def test_ease_never_drops_below_minimum():
+    result = schedule_next(item(ease_factor=MIN_EASE_FACTOR), 0, NOW)
+    assert result["ease_factor"] == MIN_EASE_FACTOR
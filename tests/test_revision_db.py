@@ -0,0 +1,49 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, update
+
+from app import models
+from app.revision import enqueue_incorrect_answers, enqueue_questions
+
+MCSC = [("a", True), ("b", False)]
+
+
+def test_incorrect_answers_are_enqueued(pg, seed):
+    async def check(db):
+        test, questions = await seed(db, {"wrong": (models.QuestionType.MCSC, MCSC), "right": (models.QuestionType.MCSC, MCSC)})
+        statuses = {"wrong": models.TestAnswerStatusEnum.INCORRECT, "right": models.TestAnswerStatusEnum.CORRECT}
+        await db.execute(insert(models.TestAnswer), [
+            {"test_created_at": test.created_at, "test_id": test.test_id, "question_id": questions[label][0].question_id, "status": status}
+            for label, status in statuses.items()
+        ])
+
+        await enqueue_incorrect_answers(db, test.user_id, test.test_id, test.created_at)
+        result = await db.execute(select(models.RevisionItem).where(models.RevisionItem.user_id == test.user_id))
+        return questions["wrong"][0].question_id, result.scalars().all()
+
+    wrong_id, items = pg(check)
+    assert [(item.question_id, item.source) for item in items] == [(wrong_id, models.RevisionSourceEnum.INCORRECT)]
+
+
+def test_incorrect_answer_overrides_starred_item(pg, seed):
+    async def check(db):
+        test, questions = await seed(db, {"starred": (models.QuestionType.MCSC, MCSC)})
+        question_id = questions["starred"][0].question_id
+        await enqueue_questions(db, test.user_id, [question_id], models.RevisionSourceEnum.STARRED)
+        # As if it had been reviewed a few times already
+        await db.execute(
+            update(models.RevisionItem).where(models.RevisionItem.user_id == test.user_id).values(repetitions=3, interval_days=15.0, due_at=datetime.utcnow() + timedelta(days=15))
+        )
+        await db.execute(insert(models.TestAnswer).values(
+            test_created_at=test.created_at, test_id=test.test_id, question_id=question_id,
+            status=models.TestAnswerStatusEnum.INCORRECT,
+        ))
+
+        await enqueue_incorrect_answers(db, test.user_id, test.test_id, test.created_at)
+        result = await db.execute(select(models.RevisionItem).where(models.RevisionItem.user_id == test.user_id))
+        return result.scalars().one()
+
+    item = pg(check)
+    assert item.source == models.RevisionSourceEnum.INCORRECT
+    assert (item.repetitions, item.interval_days) == (0, 0)
+    assert item.due_at <= datetime.utcnow()
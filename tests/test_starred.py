@@ -0,0 +1,53 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.starred import StarredCache, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 19, 12, 30, 45, 123456)
+    question_id = uuid.uuid4()
+    assert decode_cursor(encode_cursor(created_at, question_id)) == (created_at, question_id)
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "bm8tc2VwYXJhdG9y", "MjAyNi0xMC0xOXxub3QtYS11dWlk"])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = StarredCache(max_users=2, ttl_seconds=60)
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    cache.put(a, set())
+    cache.put(b, set())
+    cache.get(a)
+    cache.put(c, set())
+    assert cache.get(b) is None
+    assert cache.get(a) is not None and cache.get(c) is not None
+
+
+def test_cache_apply_patches_only_loaded_users():
+    cache = StarredCache(max_users=10, ttl_seconds=60)
+    user, other = uuid.uuid4(), uuid.uuid4()
+    q1, q2 = uuid.uuid4(), uuid.uuid4()
+    cache.put(user, {q1})
+    cache.apply(user, starred=[q2], unstarred=[q1])
+    cache.apply(other, starred=[q1], unstarred=[])
+    assert cache.get(user) == {q2}
+    assert cache.get(other) is None
+
+
+def test_cache_entries_expire():
+    now = [0.0]
+    cache = StarredCache(max_users=10, ttl_seconds=30, clock=lambda: now[0])
+    user, question_id = uuid.uuid4(), uuid.uuid4()
+    cache.put(user, {question_id})
+    now[0] = 29.0
+    # Patching a loaded set doesn't extend its lifetime
+    cache.apply(user, starred=[uuid.uuid4()], unstarred=[])
+    assert question_id in cache.get(user)
+    now[0] = 30.0
+    assert cache.get(user) is None